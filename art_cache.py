@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import queue
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageTk
+
+from telemetry import metrics
+
+THUMB_URL = "https://img.youtube.com/vi/{}/hqdefault.jpg"
+
+
+class ArtCache:
+    """Cover art on disk and pre-scaled in memory.
+
+    Downloads go through one pooled requests.Session. Files live in
+    cache_dir with their ETag/Last-Modified in index.json; entries older
+    than MAX_AGE are revalidated with a conditional GET, and the least
+    recently used files are evicted once the directory exceeds
+    budget_bytes.
+
+    request() may be called from any thread: decoding and resizing happen
+    on worker threads, and pump() (Tk thread) wraps the result in a
+    PhotoImage, keeps it in an LRU keyed by (id, size, scaling, appearance)
+    and hands it to the callback.
+    """
+
+    MAX_AGE = 7 * 24 * 3600
+
+    def __init__(self, cache_dir, budget_bytes=64 * 1024 * 1024, memory_items=256, workers=2):
+        self.cache_dir    = cache_dir
+        self.budget_bytes = budget_bytes
+        self.memory_items = memory_items
+        self.index_path   = os.path.join(cache_dir, "index.json")
+        self.lock         = threading.Lock()
+        self.index        = {}                 # id -> {"etag", "modified", "size", "used", "checked"}
+        self.images       = OrderedDict()      # key -> PhotoImage, Tk thread only
+        self.jobs         = queue.Queue()
+        self.results      = queue.Queue()
+        self.workers      = workers
+        self.session      = None               # created by the first download
+        os.makedirs(cache_dir, exist_ok=True)
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path) as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError):
+                self.index = {}
+        for _ in range(workers):
+            threading.Thread(target=self._worker, name="art-worker", daemon=True).start()
+
+    def _path(self, art_id):
+        return os.path.join(self.cache_dir, f"{art_id}.jpg")
+
+    def _session(self):
+        # requests is slow to import, keep it off the startup path
+        with self.lock:
+            if self.session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                self.session = requests.Session()
+                self.session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=self.workers))
+            return self.session
+
+    def _save_index(self):
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp, self.index_path)
+
+    # --- Disk cache ---
+    def fetch(self, art_id, url=None):
+        """Return the path of the cached image, downloading it if needed."""
+        path, now = self._path(art_id), time.time()
+        with self.lock:
+            entry = self.index.get(art_id)
+            if entry and os.path.exists(path) and now - entry["checked"] < self.MAX_AGE:
+                entry["used"] = now
+                metrics.count("art.hit")
+                return path
+        headers = {}
+        if entry and os.path.exists(path):
+            if entry.get("etag"):     headers["If-None-Match"] = entry["etag"]
+            if entry.get("modified"): headers["If-Modified-Since"] = entry["modified"]
+        try:
+            with metrics.timer("art.fetch"):
+                r = self._session().get(url or THUMB_URL.format(art_id), headers=headers, timeout=5)
+                if r.status_code != 304:
+                    r.raise_for_status()
+                    with open(path + ".tmp", "wb") as f:
+                        f.write(r.content)
+                    os.replace(path + ".tmp", path)
+            metrics.count("art.not_modified" if r.status_code == 304 else "art.downloaded")
+        except Exception:
+            metrics.count("art.error")
+            return path if entry and os.path.exists(path) else None
+        with self.lock:
+            self.index[art_id] = {
+                "etag": r.headers.get("ETag", entry and entry.get("etag")),
+                "modified": r.headers.get("Last-Modified", entry and entry.get("modified")),
+                "size": os.path.getsize(path), "used": now, "checked": now,
+            }
+            self._evict(keep=art_id)
+            self._save_index()
+        return path
+
+    def _evict(self, keep):
+        total = sum(e["size"] for e in self.index.values())
+        for art_id in sorted(self.index, key=lambda k: self.index[k]["used"]):
+            if total <= self.budget_bytes:
+                break
+            if art_id == keep:
+                continue
+            total -= self.index.pop(art_id)["size"]
+            try:
+                os.remove(self._path(art_id))
+            except OSError:
+                pass
+
+    # --- Scaled images ---
+    def request(self, art_id, size, scaling=1.0, appearance="dark", callback=None, url=None):
+        """Deliver a PhotoImage of art_id at size (logical px) to callback via pump().
+
+        On the Tk thread a memory hit is handed to callback (and returned) right
+        away; from other threads it is passed through pump() without a decode.
+        """
+        key = (art_id, size, scaling, appearance)
+        if threading.current_thread() is threading.main_thread():
+            photo = self.get(*key)
+            if photo is not None:
+                if callback is not None:
+                    callback(photo)
+                return photo
+        elif key in self.images:
+            self.results.put((key, None, url, callback))
+            return None
+        self.jobs.put((key, url, callback))
+        return None
+
+    def get(self, art_id, size, scaling=1.0, appearance="dark"):
+        """Memory cache lookup, Tk thread only. Returns None on a miss."""
+        key = (art_id, size, scaling, appearance)
+        img = self.images.get(key)
+        if img is not None:
+            self.images.move_to_end(key)
+        return img
+
+    def _worker(self):
+        while True:
+            key, url, callback = self.jobs.get()
+            art_id, (w, h), scaling, _ = key
+            path = self.fetch(art_id, url)
+            if path is None:
+                continue
+            try:
+                px = (round(w * scaling), round(h * scaling))
+                with metrics.timer("art.decode"), Image.open(path) as im:
+                    im.draft("RGB", px)    # let the JPEG decoder downscale
+                    img = im.convert("RGB").resize(px, Image.LANCZOS)
+            except OSError:
+                continue
+            self.results.put((key, img, url, callback))
+
+    def pump(self, widget, interval=50):
+        """Turn decoded images into PhotoImages on the Tk thread, then reschedule."""
+        while True:
+            try:
+                key, img, url, callback = self.results.get_nowait()
+            except queue.Empty:
+                break
+            photo = self.images.get(key)
+            if photo is None:
+                if img is None:                     # memory hit that was evicted meanwhile
+                    self.jobs.put((key, url, callback))
+                    continue
+                photo = ImageTk.PhotoImage(img, master=widget)
+            self.images[key] = photo
+            self.images.move_to_end(key)
+            while len(self.images) > self.memory_items:
+                self.images.popitem(last=False)
+            if callback is not None:
+                callback(photo)
+        widget.after(interval, self.pump, widget, interval)
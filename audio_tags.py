@@ -0,0 +1,232 @@
+import mmap
+import struct
+from collections import namedtuple
+
+Tags = namedtuple("Tags", "artist title album duration")
+NO_TAGS = Tags(None, None, None, None)
+
+# --- ID3 / MPEG ---
+ID3_FRAMES = {
+    b"TPE1": "artist", b"TIT2": "title", b"TALB": "album", b"TLEN": "length",
+    b"TP1":  "artist", b"TT2":  "title", b"TAL":  "album", b"TLE":  "length",   # ID3v2.2
+}
+ID3_ENCODINGS = ("latin-1", "utf-16", "utf-16-be", "utf-8")
+SYNC_SEARCH   = 64 * 1024     # how far past the tag to look for the first MPEG frame
+
+BITRATES = {   # (mpeg v1?, layer) -> kbps by index 1..14
+    (True, 1):  (32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2):  (32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3):  (32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def _syncsafe(b):
+    return (b[0] << 21) | (b[1] << 14) | (b[2] << 7) | b[3]
+
+
+def _text(data):
+    if not data or data[0] > 3:
+        return None
+    value = bytes(data[1:]).decode(ID3_ENCODINGS[data[0]], "replace")
+    value = value.split("\x00", 1)[0].strip()   # v2.4 may list several values
+    return value or None
+
+
+def _id3v2(mm):
+    """Text frames of a leading ID3v2 tag and the offset where audio starts."""
+    if mm[:3] != b"ID3" or len(mm) < 10:
+        return {}, 0
+    major, flags = mm[3], mm[5]
+    end = 10 + _syncsafe(mm[6:10]) + (10 if flags & 0x10 else 0)
+    if major not in (2, 3, 4) or (major == 2 and flags & 0x40):   # v2.2 compression: unreadable
+        return {}, end
+    tag = mm[10:min(end, len(mm))] if flags & 0x80 else None
+    if tag is not None and major < 4:
+        tag = tag.replace(b"\xff\x00", b"\xff")                   # whole-tag unsynchronisation
+    buf, pos = (tag, 0) if tag is not None else (mm, 10)
+    limit = len(buf) if tag is not None else min(end, len(mm))
+    if major > 2 and flags & 0x40:                                # skip the extended header
+        size = struct.unpack(">I", buf[pos:pos + 4])[0]
+        pos += _syncsafe(buf[pos:pos + 4]) if major == 4 else size + 4
+    id_len, head = (3, 6) if major == 2 else (4, 10)
+    found = {}
+    while pos + head <= limit and len(found) < 4:
+        fid = bytes(buf[pos:pos + id_len])
+        if not fid.strip(b"\x00") or not fid.isalnum():
+            break                                                 # padding
+        if major == 2:
+            size = int.from_bytes(buf[pos + 3:pos + 6], "big"); fflags = 0
+        else:
+            raw = buf[pos + 4:pos + 8]
+            size = _syncsafe(raw) if major == 4 else struct.unpack(">I", raw)[0]
+            fflags = struct.unpack(">H", buf[pos + 8:pos + 10])[0]
+        body = pos + head
+        pos = body + size
+        key = ID3_FRAMES.get(fid)
+        if key is None or pos > limit:
+            continue
+        if (major == 3 and fflags & 0x00c0) or (major == 4 and fflags & 0x000c):
+            continue                                              # compressed / encrypted
+        data = buf[body:pos]
+        if major == 4 and fflags & 0x0001:
+            data = data[4:]                                       # data length indicator
+        if major == 4 and fflags & 0x0002:
+            data = bytes(data).replace(b"\xff\x00", b"\xff")
+        if major == 3 and fflags & 0x0020:
+            data = data[1:]                                       # group id
+        value = _text(data)
+        if value is not None:
+            found.setdefault(key, value)
+    return found, end
+
+
+def _id3v1(mm):
+    if len(mm) < 128 or mm[-128:-125] != b"TAG":
+        return {}
+    tag = mm[-128:]
+    fields = {}
+    for key, lo in (("title", 3), ("artist", 33), ("album", 63)):
+        value = tag[lo:lo + 30].split(b"\x00", 1)[0].decode("latin-1").strip()
+        if value:
+            fields[key] = value
+    return fields
+
+
+def _mpeg_header(mm, pos):
+    if pos + 4 > len(mm):
+        return None
+    h = struct.unpack(">I", mm[pos:pos + 4])[0]
+    version, layer = (h >> 19) & 3, 4 - ((h >> 17) & 3)
+    br_index, sr_index = (h >> 12) & 15, (h >> 10) & 3
+    if (h >> 21) & 0x7ff != 0x7ff or version == 1 or layer == 4 or br_index in (0, 15) or sr_index == 3:
+        return None
+    v1 = version == 3
+    bitrate = BITRATES[(v1, layer)][br_index - 1] * 1000
+    rate = SAMPLE_RATES[version][sr_index]
+    padding, mono = (h >> 9) & 1, (h >> 6) & 3 == 3
+    if layer == 1:
+        samples, length = 384, (12 * bitrate // rate + padding) * 4
+    else:
+        samples = 1152 if layer == 2 or v1 else 576
+        length = samples // 8 * bitrate // rate + padding
+    return {"v1": v1, "bitrate": bitrate, "rate": rate, "samples": samples, "length": length, "mono": mono}
+
+
+def _mpeg_duration(mm, start):
+    """Duration from the Xing/Info or VBRI header, else from the bitrate of the first frame."""
+    pos, stop = start, min(len(mm), start + SYNC_SEARCH)
+    while True:
+        pos = mm.find(b"\xff", pos, stop)
+        if pos < 0:
+            return None
+        hdr = _mpeg_header(mm, pos)
+        # a second header right behind the first rules out stray 0xff bytes
+        if hdr and (pos + hdr["length"] + 4 > len(mm) or _mpeg_header(mm, pos + hdr["length"])):
+            break
+        pos += 1
+    side = (32 if not hdr["mono"] else 17) if hdr["v1"] else (17 if not hdr["mono"] else 9)
+    xing = pos + 4 + side
+    if mm[xing:xing + 4] in (b"Xing", b"Info"):
+        if struct.unpack(">I", mm[xing + 4:xing + 8])[0] & 1:
+            frames = struct.unpack(">I", mm[xing + 8:xing + 12])[0]
+            return frames * hdr["samples"] / hdr["rate"]
+    vbri = pos + 36
+    if mm[vbri:vbri + 4] == b"VBRI":
+        frames = struct.unpack(">I", mm[vbri + 14:vbri + 18])[0]
+        return frames * hdr["samples"] / hdr["rate"]
+    audio = len(mm) - pos - (128 if mm[-128:-125] == b"TAG" else 0)
+    return audio * 8 / hdr["bitrate"]
+
+
+def _mp3(mm):
+    fields, start = _id3v2(mm)
+    if not {"artist", "title"} <= fields.keys():
+        for key, value in _id3v1(mm).items():
+            fields.setdefault(key, value)
+    duration = None
+    if fields.get("length", "").isdigit():
+        duration = int(fields["length"]) / 1000
+    if not duration:
+        duration = _mpeg_duration(mm, start)
+    return Tags(fields.get("artist"), fields.get("title"), fields.get("album"), duration)
+
+
+# --- MP4 ---
+MP4_ITEMS = {b"\xa9ART": "artist", b"aART": "album_artist", b"\xa9nam": "title", b"\xa9alb": "album"}
+MP4_VALUE_MAX = 4096   # skip anything bigger (cover art lives in the same list)
+
+
+def _atoms(mm, pos, end):
+    """(type, body_start, body_end) of the boxes in mm[pos:end]."""
+    while pos + 8 <= end:
+        size, kind = struct.unpack(">I4s", mm[pos:pos + 8])
+        head = 8
+        if size == 1:
+            size, head = struct.unpack(">Q", mm[pos + 8:pos + 16])[0], 16
+        elif size == 0:
+            size = end - pos
+        if size < head or pos + size > end:
+            return
+        yield kind, pos + head, pos + size
+        pos += size
+
+
+def _child(mm, kind, start, end):
+    for k, lo, hi in _atoms(mm, start, end):
+        if k == kind:
+            return lo, hi
+    return None
+
+
+def _mp4(mm):
+    moov = _child(mm, b"moov", 0, len(mm))
+    if moov is None:
+        return NO_TAGS
+    duration, fields = None, {}
+    mvhd = _child(mm, b"mvhd", *moov)
+    if mvhd is not None:
+        lo = mvhd[0]
+        if mm[lo] == 1:
+            scale, length = struct.unpack(">IQ", mm[lo + 20:lo + 32])
+        else:
+            scale, length = struct.unpack(">II", mm[lo + 12:lo + 20])
+        if scale and length:
+            duration = length / scale
+    udta = _child(mm, b"udta", *moov)
+    meta = udta and _child(mm, b"meta", *udta)
+    if meta:
+        lo, hi = meta
+        # ISO meta is a full box (version + flags), QuickTime's is not
+        if mm[lo + 4:lo + 8] != b"hdlr":
+            lo += 4
+        ilst = _child(mm, b"ilst", lo, hi)
+        for kind, ilo, ihi in _atoms(mm, *ilst) if ilst else ():
+            key = MP4_ITEMS.get(kind)
+            if key is None or ihi - ilo > MP4_VALUE_MAX:
+                continue
+            data = _child(mm, b"data", ilo, ihi)
+            if data is not None and mm[data[0]:data[0] + 4] == b"\x00\x00\x00\x01":   # UTF-8 text
+                value = mm[data[0] + 8:data[1]].decode("utf-8", "replace").strip()
+                if value:
+                    fields[key] = value
+    return Tags(fields.get("artist") or fields.get("album_artist"), fields.get("title"),
+                fields.get("album"), duration)
+
+
+def read_tags(path):
+    """Artist/title/album/duration from the file headers; missing fields are None.
+
+    The file is mmapped, so only the pages holding the tags (and the first
+    MPEG frame or the moov box) are ever read; audio is never decoded.
+    """
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[4:8] == b"ftyp" or path.lower().endswith(".m4a"):
+                return _mp4(mm)
+            return _mp3(mm)
+    except (OSError, ValueError, struct.error, IndexError, TypeError):
+        return NO_TAGS
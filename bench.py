@@ -0,0 +1,586 @@
+"""Offline benchmarks for KEEP-IT PLAYR. Run: python3 bench.py [--out results.jsonl] [name ...]
+
+With --out, telemetry is collected while each benchmark runs and appended to
+the file as one line per benchmark (tagged with the release and commit), and
+timers whose median got more than 25% slower since the previous line of the
+same benchmark are flagged.
+"""
+import io, os, re, sys, json, time, wave, struct, random, shutil, tempfile, statistics, threading, subprocess, socketserver, types
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from library_catalog import LibraryCatalog
+from library_search import SearchIndex
+from library_import import LibraryImporter
+from mpv_controller import AsyncMPVController
+from player_supervisor import PlayerSupervisor
+from stream_pipeline import StreamDownload
+from art_cache import ArtCache
+from telemetry import metrics
+
+
+def timed(fn):
+    t0 = time.perf_counter(); fn()
+    return (time.perf_counter() - t0) * 1000
+
+
+def make_library(root, n):
+    lib = os.path.join(root, "library"); os.makedirs(lib)
+    for i in range(n):
+        ext = ".m4a" if i % 2 else ".mp3"
+        with open(os.path.join(lib, f"Artist {i % 500} - Title {i}{ext}"), "wb") as f:
+            f.write(b"\0" * (i % 64))
+    return lib
+
+
+class FakeMPV(socketserver.ThreadingUnixStreamServer):
+    """Minimal mpv JSON IPC server: properties, observe_property, and an
+    unrelated event before every reply so clients have to demultiplex.
+    With reorder, every other reply is held back until after the next one."""
+    daemon_threads = True
+
+    def __init__(self, path, reorder=False):
+        self.props = {"volume": 100, "pause": False, "time-pos": 0.0}
+        self.commands = 0
+        self.reorder = reorder
+        super().__init__(path, FakeMPVHandler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+
+class FakeMPVHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.lock, self.held = threading.Lock(), None
+
+    def send(self, *msgs):
+        with self.lock:
+            self.wfile.write(b"".join((json.dumps(m) + "\n").encode() for m in msgs))
+            self.wfile.flush()
+
+    def release(self):
+        with self.lock:
+            held, self.held = self.held, None
+        if held: self.send(held)
+
+    def handle(self):
+        srv, observed = self.server, {}
+        for line in self.rfile:
+            msg = json.loads(line); cmd = msg["command"]; srv.commands += 1
+            reply = {"request_id": msg.get("request_id", 0), "error": "success", "data": None}
+            if cmd[0] == "get_property":
+                if cmd[1] in srv.props: reply["data"] = srv.props[cmd[1]]
+                else: reply["error"] = "property unavailable"
+            elif cmd[0] == "set_property":
+                srv.props[cmd[1]] = cmd[2]
+                if cmd[1] in observed:
+                    self.send({"event": "property-change", "id": observed[cmd[1]], "name": cmd[1], "data": cmd[2]})
+            elif cmd[0] == "observe_property":
+                observed[cmd[2]] = cmd[1]
+            self.send({"event": "audio-reconfig"})
+            if not srv.reorder:
+                self.send(reply); continue
+            with self.lock:
+                held, self.held = self.held, None if self.held else reply
+            if held is None:                          # goes out after the next reply, or on its own
+                threading.Timer(0.05, self.release).start()
+            else:
+                self.send(reply, held)
+
+
+def fake_mpv(root, reorder=False):
+    path = os.path.join(root, "mpvsocket")
+    return FakeMPV(path, reorder), path
+
+
+# --- Benchmarks ---
+def bench_catalog(sizes=(1_000, 10_000, 100_000)):
+    print(f"{'files':>8} {'cold scan':>12} {'warm load':>12} {'rescan 1%':>12}")
+    for n in sizes:
+        root = tempfile.mkdtemp(prefix="kip-bench-")
+        try:
+            lib = make_library(root, n); db = os.path.join(root, "library.db")
+            cat = LibraryCatalog(lib, db)
+            cold = timed(lambda: (cat.refresh(), cat.tracks())); cat.close()
+            cat = LibraryCatalog(lib, db)
+            warm = timed(lambda: (cat.refresh(), cat.tracks()))
+            for i in range(0, n, 100):
+                with open(os.path.join(lib, f"New {i} - Track.mp3"), "wb") as f: f.write(b"x")
+            incr = timed(lambda: (cat.refresh(), cat.tracks())); cat.close()
+            print(f"{n:>8} {cold:>10.1f}ms {warm:>10.1f}ms {incr:>10.1f}ms")
+        finally:
+            shutil.rmtree(root)
+
+
+def synthetic_tracks(n, seed=1):
+    rnd = random.Random(seed)
+    syl = "ka lo mi ra ne to su vi da re on el an ir us ba".split()
+    word = lambda: "".join(rnd.choice(syl) for _ in range(rnd.randint(1, 3)))
+    artists = [f"{word().title()} {word().title()}" for _ in range(max(1, n // 20))]
+    for i in range(n):
+        artist = rnd.choice(artists); title = " ".join(word() for _ in range(rnd.randint(1, 4)))
+        yield f"{artist} - {title} {i}.m4a", artist, title, f"{word()} {word()}"
+
+
+def bench_search(n=50_000, queries=("kalo mi", "ranetosu", "vi da", "lomira", "sux on"), budget=16.0):
+    # per keystroke like FOGRPlayer.filter_library: search(), compare, set_items() swap
+    import tkinter
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "vendor"))
+    docs = [(path, artist, title, album, path) for path, artist, title, album in synthetic_tracks(n)]
+    build = timed(lambda: SearchIndex(docs)); idx = SearchIndex(docs)
+    root = None
+    try:
+        import customtkinter as ctk
+        from virtual_list import VirtualList
+        root = ctk.CTk(); root.geometry("800x600")
+        view = VirtualList(root, lambda parent: ctk.CTkLabel(parent, anchor="w"),
+                           lambda row, item: row.configure(text=item))
+        view.pack(fill="both", expand=True); root.update()
+        swap, what = lambda items: (view.set_items(items), root.update_idletasks()), "set_items + redraw"
+    except tkinter.TclError:
+        view = types.SimpleNamespace(items=[])
+        def swap(items): view.items = list(items)   # the copy set_items makes; rows need a display
+        what = "list swap only, no display"
+    def keystroke(q):
+        results = idx.search(q)
+        if results != view.items:
+            swap(results)
+    lat = []
+    try:
+        for q in queries:
+            for k in range(1, len(q) + 1):
+                lat.append(timed(lambda: keystroke(q[:k])))
+    finally:
+        if root is not None:
+            root.destroy()
+    lat.sort()
+    print(f"{n} tracks, index build {build:.0f}ms, {len(lat)} keystrokes ({what})")
+    print(f"per keystroke: median {statistics.median(lat):.2f}ms  "
+          f"p95 {lat[int(len(lat) * .95)]:.2f}ms  max {lat[-1]:.2f}ms  (budget {budget:.0f}ms)")
+
+
+def id3_frame(fid, text, enc):
+    body = bytes((enc,)) + text.encode(("latin-1", "utf-16", None, "utf-8")[enc])
+    return fid + struct.pack(">I", len(body)) + b"\0\0" + body
+
+
+def write_mp3(path, artist, title, album, frames, xing, art_bytes):
+    # ID3v2.3 tag (+ padding and optional cover), then 128k/44.1kHz MPEG-1 layer III frames
+    enc = 1 if any(ord(c) > 255 for c in artist + title + album) else 0
+    tag = id3_frame(b"TPE1", artist, enc) + id3_frame(b"TIT2", title, enc) + id3_frame(b"TALB", album, enc)
+    if art_bytes:
+        apic = b"\0image/jpeg\0\3\0" + b"\xff" * art_bytes
+        tag = id3_frame(b"TCON", "Pop", 0) + b"APIC" + struct.pack(">I", len(apic)) + b"\0\0" + apic + tag
+    tag += b"\0" * 512
+    size = len(tag)
+    head = b"ID3\3\0\0" + bytes(((size >> 21) & 127, (size >> 14) & 127, (size >> 7) & 127, size & 127))
+    frame = b"\xff\xfb\x90\x00" + b"\0" * 413                      # 417 bytes, no padding
+    first = frame
+    if xing:
+        first = frame[:36] + b"Xing" + struct.pack(">II", 1, xing) + frame[48:]
+    with open(path, "wb") as f:
+        f.write(head + tag + first + frame * (frames - 1))
+    return xing * 1152 / 44100 if xing else frames * 417 * 8 / 128000
+
+
+def mp4_box(kind, *children):
+    body = b"".join(children)
+    return struct.pack(">I", 8 + len(body)) + kind + body
+
+
+def write_m4a(path, artist, title, album, seconds, moov_last, art_bytes):
+    item = lambda kind, text: mp4_box(kind, mp4_box(b"data", b"\0\0\0\1\0\0\0\0" + text.encode()))
+    items = [item(b"\xa9nam", title), item(b"\xa9ART", artist), item(b"\xa9alb", album)]
+    if art_bytes:
+        items.insert(0, mp4_box(b"covr", mp4_box(b"data", b"\0\0\0\x0d\0\0\0\0" + b"\xff" * art_bytes)))
+    hdlr = mp4_box(b"hdlr", b"\0" * 8 + b"mdirappl" + b"\0" * 10)
+    mvhd = mp4_box(b"mvhd", b"\0" * 12 + struct.pack(">II", 44100, int(seconds * 44100)) + b"\0" * 80)
+    moov = mp4_box(b"moov", mvhd, mp4_box(b"udta", mp4_box(b"meta", b"\0" * 4, hdlr, mp4_box(b"ilst", *items))))
+    ftyp, mdat = mp4_box(b"ftyp", b"M4A \0\0\0\0"), mp4_box(b"mdat", b"\0" * 8192)
+    with open(path, "wb") as f:
+        f.write(ftyp + (mdat + moov if moov_last else moov + mdat))
+    return int(seconds * 44100) / 44100
+
+
+def make_tagged_library(root, n, seed=2):
+    # file names carry no artist, so only real tag parsing gets them right
+    lib = os.path.join(root, "library"); os.makedirs(lib)
+    expect = {}
+    for i, (_, artist, title, album) in enumerate(synthetic_tracks(n, seed)):
+        if i % 7 == 0: artist += " ü"
+        if i % 11 == 0: title += " \u266b"
+        art = 20_000 if i % 10 == 0 else 0
+        if i % 2:
+            name = f"track{i:06d}.m4a"
+            secs = write_m4a(os.path.join(lib, name), artist, title, album, 60 + i % 300 + 0.5, i % 4 == 1, art)
+        else:
+            name = f"track{i:06d}.mp3"
+            secs = write_mp3(os.path.join(lib, name), artist, title, album, 20, 5000 + i if i % 4 == 0 else 0, art)
+        expect[name] = (artist, title, album, secs)
+    return lib, expect
+
+
+def bench_tags(n=5_000, worker_counts=(1, 4)):
+    root = tempfile.mkdtemp(prefix="kip-bench-")
+    try:
+        lib, expect = make_tagged_library(root, n)
+        cat = LibraryCatalog(lib, os.path.join(root, "library.db"))
+        scan = timed(cat.refresh)
+        print(f"{n} files (mp3 + m4a, 10% with 20KB cover art), scan {scan:.0f}ms")
+        for workers in worker_counts:
+            with cat.lock, cat.db: cat.db.execute("UPDATE tracks SET tagged=0")
+            ms = timed(lambda: cat.tag_pending(workers))
+            print(f"tags with {workers} worker(s): {ms:.0f}ms, {n / ms * 1000:.0f} files/s")
+        bad = [t.path for t in cat.tracks()
+               if (t.artist, t.title, t.album) != expect[t.path][:3] or abs(t.duration - expect[t.path][3]) > 0.01]
+        again = timed(lambda: cat.tag_pending())
+        print(f"mismatches vs. written tags: {len(bad)}; second pass {again:.1f}ms (cached by path/mtime/size)")
+        cat.close()
+    finally:
+        shutil.rmtree(root)
+
+
+def bench_import(n=5_000, dup_share=0.2):
+    root = tempfile.mkdtemp(prefix="kip-bench-")
+    try:
+        src, _ = make_tagged_library(os.path.join(root, "src"), n)
+        files = sorted(os.path.join(src, f) for f in os.listdir(src))
+        again = os.path.join(root, "again"); os.makedirs(again)
+        for path in files[:int(n * dup_share)]:      # dropped a second time from another folder
+            shutil.copy(path, again)
+        plain = os.path.join(root, "plain"); os.makedirs(plain)
+        ms = timed(lambda: [shutil.copy(f, plain) for f in files])
+        sizes = len({os.path.getsize(f) for f in files})
+        print(f"{n} files ({sizes} distinct sizes, each collision costs a hash), shutil.copy one by one: {ms:.0f}ms")
+
+        lib = os.path.join(root, "library"); os.makedirs(lib)
+        cat = LibraryCatalog(lib, os.path.join(root, "library.db"))
+        imp = LibraryImporter(cat)
+        def run(paths):
+            total = imp.progress["total"] + len(list(imp._expand(paths)))
+            imp.import_paths(paths)
+            while imp.progress["done"] < total:
+                time.sleep(0.005)
+        ms = timed(lambda: run([src]))
+        print(f"importer, empty library: {ms:.0f}ms, {n / ms * 1000:.0f} files/s, placed by {imp.placed}")
+        ms = timed(lambda: run([again]))
+        p = imp.progress
+        print(f"importer, {len(os.listdir(again))} re-dropped copies: {ms:.0f}ms, "
+              f"{p['duplicates']} duplicates skipped, {len(os.listdir(lib))} files in library")
+        cat.close()
+    finally:
+        shutil.rmtree(root)
+
+
+def bench_mpv_ipc(rtt_samples=200, burst=1_000):
+    root = tempfile.mkdtemp(prefix="kip-bench-")
+    srv, path = fake_mpv(root)
+    mpv = AsyncMPVController(path, timeout=5)
+    try:
+        mpv.connected.wait(5)
+        seen = []
+        mpv.observe("volume", seen.append)
+        rtt = sorted(timed(lambda: mpv.get_property("time-pos")) for _ in range(rtt_samples))
+        print(f"round trip: median {statistics.median(rtt):.3f}ms  p99 {rtt[int(len(rtt) * .99)]:.3f}ms")
+        t0 = time.perf_counter()
+        futs = [mpv.command_async("set_property", "volume", i % 100) for i in range(burst)]
+        ok = sum(1 for f in futs if f.exception(10) is None)
+        dt = time.perf_counter() - t0
+        print(f"burst of {burst}: {ok} ok in {dt * 1000:.1f}ms, {burst / dt:,.0f} cmds/s, "
+              f"{len(seen)} volume events")
+    finally:
+        mpv.close(); srv.shutdown(); srv.server_close(); shutil.rmtree(root)
+
+
+def write_tone(path, seconds=1.0, rate=44100):
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1); w.setsampwidth(2); w.setframerate(rate)
+        w.writeframes(b"\x00\x10" * int(rate * seconds))
+
+
+def bench_player(tracks=4):
+    if not shutil.which("mpv"):
+        print("mpv not installed, skipped"); return
+    root = tempfile.mkdtemp(prefix="kip-bench-")
+    paths = [os.path.join(root, f"t{i}.wav") for i in range(tracks)]
+    for p in paths: write_tone(p)
+    t0 = time.perf_counter()
+    player = PlayerSupervisor(socket_dir=root)
+    try:
+        player.set_property("volume", 0)
+        player.play_queue(paths, 0)
+        while not player.stats["time_to_first_audio"] and time.perf_counter() - t0 < 10:
+            time.sleep(0.005)
+        print(f"cold start (spawn + load): {(time.perf_counter() - t0) * 1000:.0f}ms")
+        time.sleep(tracks + 0.5)
+        player.play_queue(paths[:1], 0); time.sleep(0.5)
+        for name, r in player.report().items():
+            print(f"{name}: n={r['n']} median {r['median']:.1f}ms max {r['max']:.1f}ms")
+    finally:
+        player.close(); shutil.rmtree(root)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves server.fixture at server.rate bytes/s; /broken stops halfway."""
+    def log_message(self, *args): pass
+
+    def do_GET(self):
+        data, rate = self.server.fixture, self.server.rate
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/wav")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        end = len(data) // 2 if self.path == "/broken" else len(data)
+        step = 32 * 1024
+        for i in range(0, end, step):
+            self.wfile.write(data[i:i + step])
+            time.sleep(step / rate)
+
+
+def fixture_server(data, rate):
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    srv.fixture, srv.rate = data, rate
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f"http://127.0.0.1:{srv.server_port}"
+
+
+def tone_fixture(root, seconds=24.0):
+    path = os.path.join(root, "fixture.wav"); write_tone(path, seconds)
+    with open(path, "rb") as f: data = f.read()
+    os.remove(path)
+    return data
+
+
+def playable(url, fixture):
+    """Whether what on_ready handed out plays: through mpv when installed,
+    else the file must be the fixture's prefix and decode as WAV."""
+    if shutil.which("mpv"):
+        return subprocess.run(["mpv", "--no-config", "--ao=null", "--vo=null", "--end=0.2", url],
+                              capture_output=True, timeout=30).returncode == 0
+    with open(url.removeprefix("appending://"), "rb") as f:
+        head = f.read(StreamDownload.START_BYTES)
+    if len(head) < StreamDownload.START_BYTES or head != fixture[:len(head)]:
+        return False
+    with wave.open(io.BytesIO(head)) as w:
+        return len(w.readframes(w.getframerate() // 10)) == w.getframerate() // 10 * w.getsampwidth()
+
+
+def stream_fixture(info, root, fixture):
+    """Run one StreamDownload to the end; returns its events, with times in seconds."""
+    events, done, t0 = {}, threading.Event(), time.perf_counter()
+    def ready(url):
+        events["ready"] = time.perf_counter() - t0
+        events["url"], events["playable"] = url, playable(url, fixture)
+    StreamDownload(info, root, on_ready=ready,
+                   on_done=lambda path: (events.update(done=time.perf_counter() - t0, path=path), done.set()),
+                   on_error=lambda e, started: (events.update(error=e, started=started), done.set())).start()
+    done.wait(30)
+    return events
+
+
+def bench_stream(seconds=24.0, rate=2 * 1024 * 1024):
+    root = tempfile.mkdtemp(prefix="kip-bench-")
+    data = tone_fixture(root, seconds)
+    srv, base = fixture_server(data, rate)
+    try:
+        for path in ("/track.wav", "/broken"):
+            info = {"title": "Fixture " + path.strip("/").split(".")[0], "url": base + path, "ext": "wav", "headers": {}}
+            dest = tempfile.mkdtemp(dir=root)
+            ev = stream_fixture(info, dest, data)
+            print(f"{path}: playable={ev.get('playable')} after {ev.get('ready', 0) * 1000:.0f}ms, "
+                  + (f"saved after {ev['done'] * 1000:.0f}ms, intact={open(ev['path'], 'rb').read() == data}"
+                     if "done" in ev else f"failed ({ev.get('error')!r}), leftovers={os.listdir(dest)}"))
+    finally:
+        srv.shutdown(); shutil.rmtree(root)
+
+
+class CoverHandler(BaseHTTPRequestHandler):
+    """Serves server.jpeg for any path, honouring If-None-Match."""
+    def log_message(self, *args): pass
+
+    def do_GET(self):
+        self.server.hits += 1
+        if self.headers.get("If-None-Match") == '"cover"':
+            self.send_response(304); self.end_headers(); return
+        self.send_response(200)
+        self.send_header("ETag", '"cover"')
+        self.send_header("Content-Length", str(len(self.server.jpeg)))
+        self.end_headers()
+        self.wfile.write(self.server.jpeg)
+
+
+def bench_art(covers=200):
+    from io import BytesIO
+    from PIL import Image
+    buf = BytesIO(); Image.new("RGB", (480, 360), (200, 40, 90)).save(buf, "JPEG", quality=90)
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), CoverHandler)
+    srv.jpeg, srv.hits = buf.getvalue(), 0
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{srv.server_port}/"
+    root = tempfile.mkdtemp(prefix="kip-bench-")
+    try:
+        budget = len(srv.jpeg) * covers // 2
+        art = ArtCache(root, budget_bytes=budget)
+        ids = [f"v{i}" for i in range(covers)]
+        cold = timed(lambda: [art.fetch(i, base + i) for i in ids])
+        warm = timed(lambda: [art.fetch(i, base + i) for i in ids[-covers // 4:]])
+        for e in art.index.values(): e["checked"] = 0
+        hits = srv.hits
+        reval = timed(lambda: [art.fetch(i, base + i) for i in ids[-covers // 4:]])
+        on_disk = sum(os.path.getsize(os.path.join(root, f)) for f in os.listdir(root) if f.endswith(".jpg"))
+        print(f"{covers} covers: cold {cold / covers:.2f}ms/cover, disk hit {warm / (covers // 4):.3f}ms/cover, "
+              f"304 revalidation {reval / (covers // 4):.2f}ms/cover ({srv.hits - hits} requests)")
+        print(f"disk {on_disk // 1024}KiB of {budget // 1024}KiB budget, {len(art.index)} files kept")
+        t0 = time.perf_counter()
+        for i in ids[-covers // 4:]: art.request(i, (120, 90), 2.0, "dark", url=base + i)
+        for _ in range(covers // 4): art.results.get(timeout=10)
+        print(f"decode+scale off the UI thread: {(time.perf_counter() - t0) * 1000 / (covers // 4):.2f}ms/cover")
+    finally:
+        srv.shutdown(); shutil.rmtree(root)
+
+
+def bench_buttons(n=5_000):
+    import tkinter
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "vendor"))
+    import customtkinter as ctk
+    from customtkinter.windows.widgets.core_rendering import DrawEngine
+    try:
+        root = ctk.CTk()
+    except tkinter.TclError:
+        print("no display, skipped"); return
+    try:
+        for memo in (False, True):
+            DrawEngine.memoize_geometry = memo
+            frame = ctk.CTkFrame(root)
+            buttons = []
+            create = timed(lambda: buttons.extend(ctk.CTkButton(frame, text=f"Song {i}", fg_color="#333",
+                                                                anchor="w") for i in range(n)))
+            reconfigure = timed(lambda: [b.configure(width=140) for b in buttons])
+            redraw = timed(lambda: [b._draw() for b in buttons])
+            print(f"{'memoized' if memo else 'baseline'}: {n} buttons created {create:.0f}ms, "
+                  f"configure {reconfigure:.0f}ms, redraw {redraw:.0f}ms")
+            frame.destroy()
+    finally:
+        DrawEngine.memoize_geometry = True
+        root.destroy()
+
+
+def bench_theme(n=5_000, visible=40, toggles=4):
+    import tkinter
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "vendor"))
+    import customtkinter as ctk
+    from customtkinter.windows.widgets.appearance_mode import AppearanceModeTracker
+    try:
+        root = ctk.CTk()
+    except tkinter.TclError:
+        print("no display, skipped"); return
+    try:
+        shown, hidden = ctk.CTkFrame(root), ctk.CTkFrame(root)
+        shown.pack()
+        for i in range(n):
+            ctk.CTkButton(shown if i < visible else hidden, text=f"Song {i}").pack()
+        root.update()
+        for i in range(toggles):
+            t0 = time.perf_counter()
+            ctk.set_appearance_mode("light" if i % 2 == 0 else "dark")
+            root.update()
+            while AppearanceModeTracker.deferred_callbacks:
+                root.update()
+            u = AppearanceModeTracker.last_update
+            print(f"toggle {i + 1}: {u['visible']} callbacks in {u['visible_ms']:.1f}ms before first paint, "
+                  f"{u['deferred']} off-screen in {u['deferred_ms']:.1f}ms, done after {(time.perf_counter() - t0) * 1000:.0f}ms")
+    finally:
+        root.destroy()
+
+
+def bench_startup(runs=3):
+    here = os.path.dirname(os.path.abspath(__file__))
+    probe = ("import sys, main; print(round((main.IMPORTS_DONE - main.STARTUP_T0) * 1000), "
+             "sorted(m for m in ('requests', 'stream_pipeline') if m in sys.modules))")
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", probe], cwd=here, capture_output=True, text=True).stdout.split(None, 1)
+        print(f"import main: {out[0]}ms, deferred modules already loaded: {out[1].strip()}")
+    if not os.environ.get("DISPLAY"):
+        print("no display, launch skipped"); return
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "main.py"], cwd=here, capture_output=True, text=True,
+                             env=dict(os.environ, KIP_EXIT_AFTER_STARTUP="1"), timeout=60).stdout
+        print(next((l for l in out.splitlines() if "startup:" in l), "no startup report"))
+
+
+def bench_telemetry(calls=200_000):
+    was = metrics.enabled
+    try:
+        for metrics.enabled in (False, True):
+            metrics.reset()
+            def spans():
+                for _ in range(calls):
+                    with metrics.timer("bench.span"): pass
+            ms = timed(spans)
+            print(f"timer() {'on ' if metrics.enabled else 'off'}: {ms * 1000 / calls:.3f}us per span")
+    finally:
+        metrics.enabled = was
+        metrics.reset()
+
+
+BENCHMARKS = {
+    "catalog": bench_catalog,
+    "search":  bench_search,
+    "mpv":     bench_mpv_ipc,
+    "player":  bench_player,
+    "stream":  bench_stream,
+    "art":     bench_art,
+    "buttons": bench_buttons,
+    "theme":   bench_theme,
+    "startup": bench_startup,
+    "tags":    bench_tags,
+    "import":  bench_import,
+    "telemetry": bench_telemetry,
+}
+
+
+def release():
+    """VERSION from build-deb.sh and the current commit, to tell result lines apart."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        with open(os.path.join(here, "build-deb.sh")) as f:
+            version = re.search(r'^VERSION="(.+)"', f.read(), re.M).group(1)
+    except (OSError, AttributeError):
+        version = "?"
+    commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=here,
+                            capture_output=True, text=True).stdout.strip()
+    return f"{version}+{commit}" if commit else version
+
+
+def regressions(path, name, snap, factor=1.25, min_n=5):
+    """(timer, old p50, new p50) for timers of name that got slower than in the last line."""
+    prev = None
+    try:
+        with open(path) as f:
+            for line in f:
+                rec = json.loads(line)
+                if rec.get("bench") == name:
+                    prev = rec
+    except (OSError, ValueError):
+        return []
+    if prev is None:
+        return []
+    out = []
+    for timer, t in snap["timers"].items():
+        old = prev["timers"].get(timer)
+        if old and min(t["n"], old["n"]) >= min_n and t["p50_ms"] > old["p50_ms"] * factor:
+            out.append((timer, old["p50_ms"], t["p50_ms"]))
+    return out
+
+if __name__ == "__main__":
+    names, out = sys.argv[1:], None
+    if "--out" in names:
+        i = names.index("--out")
+        out = names[i + 1]; del names[i:i + 2]
+    tag = release() if out else None
+    for name in names or BENCHMARKS:
+        print(f"== {name} ==")
+        metrics.reset(); metrics.enabled = out is not None
+        ms = timed(BENCHMARKS[name])
+        if out:
+            for timer, old, new in regressions(out, name, metrics.snapshot()):
+                print(f"⚠ {timer}: median {old:.2f}ms -> {new:.2f}ms")
+            metrics.export(out, bench=name, release=tag, wall_ms=round(ms, 1))
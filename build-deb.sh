@@ -15,8 +15,9 @@ mkdir -p "${BUILD}/usr/local/bin"
 mkdir -p "${BUILD}/usr/share/${PKG}"
 mkdir -p "${BUILD}/usr/share/applications"
 
-# 4️⃣ Copy application files + assets + vendor
-cp main.py mpv_controller.py "${BUILD}/usr/share/${PKG}/"
+# 4️⃣ Pre-decode the icons, then copy application files + assets + vendor
+python3 icon_sprite.py assets/icons assets/icons.sprite
+cp main.py mpv_controller.py virtual_list.py library_catalog.py library_search.py library_import.py audio_tags.py player_supervisor.py stream_pipeline.py download_manager.py art_cache.py icon_sprite.py telemetry.py "${BUILD}/usr/share/${PKG}/"
 cp -r assets art vendor "${BUILD}/usr/share/${PKG}/"
 
 # 5️⃣ Create launcher script and install it
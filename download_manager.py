@@ -0,0 +1,223 @@
+import os
+import re
+import json
+import time
+import hashlib
+import queue
+import threading
+import subprocess
+
+from telemetry import metrics
+
+PROGRESS_RE = re.compile(r"^\[download\]\s+([\d.]+)%")
+VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+
+def youtube_id(url):
+    """The video id of a YouTube link, or None."""
+    url = url.strip()
+    if "v=" in url:
+        vid = url.split("v=")[1].split("&")[0]
+    elif "youtu" in url:
+        vid = url.rstrip("/").split("/")[-1].split("?")[0]
+    else:
+        return None
+    return vid if VIDEO_ID_RE.match(vid) else None
+
+
+def url_key(url):
+    """Dedup key: the YouTube video id when there is one, else the URL."""
+    return youtube_id(url) or url.strip()
+
+
+class DownloadJob:
+    # queued -> running -> done | failed | cancelled  (running -> queued on retry)
+    def __init__(self, url, state="queued", attempts=0, filename=None, error=None):
+        self.url      = url
+        self.state    = state
+        self.attempts = attempts
+        self.filename = filename
+        self.error    = error
+        self.progress = 1.0 if state == "done" else 0.0
+        self.proc     = None
+
+    def to_json(self):
+        return {"url": self.url, "state": self.state, "attempts": self.attempts,
+                "filename": self.filename, "error": self.error}
+
+
+class DownloadManager:
+    """Bounded pool of yt-dlp workers fed from a persistent job list.
+
+    Jobs are stored in store_path (saved_links.json), deduplicated by video
+    id, and survive restarts: anything queued or running when the app went
+    away is queued again and yt-dlp --continue resumes its .part file.
+    Failed jobs are retried RETRY_LIMIT times with exponential backoff.
+    Files land in a per-job directory under dest_dir (a staging area, not
+    the library) and on_done(path) hands them on.
+    version is bumped on every change so the UI can poll cheaply.
+    """
+
+    RETRY_LIMIT = 3
+    RETRY_BASE  = 2.0
+
+    def __init__(self, dest_dir, store_path, workers=3, on_done=None):
+        self.dest_dir   = dest_dir
+        self.store_path = store_path
+        self.on_done    = on_done or (lambda path: None)
+        self.lock       = threading.Lock()
+        self.save_lock  = threading.Lock()
+        self.jobs       = {}              # url_key -> DownloadJob, insertion ordered
+        self.queue      = queue.Queue()
+        self.version    = 0
+        self.closing    = False
+        self.load()
+        for _ in range(workers):
+            threading.Thread(target=self._worker, name="download-worker", daemon=True).start()
+
+    # --- Persistence ---
+    def load(self):
+        if not os.path.exists(self.store_path):
+            return
+        try:
+            with open(self.store_path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print("❌ Could not read", self.store_path, e)
+            return
+        for entry in entries:
+            if isinstance(entry, str):
+                # old format: a plain list of links that were already fetched
+                entry = {"url": entry, "state": "done"}
+            job = DownloadJob(**entry)
+            if job.state in ("queued", "running"):
+                job.state = "queued"
+                self.queue.put(url_key(job.url))
+            self.jobs[url_key(job.url)] = job
+
+    def save(self):
+        with self.lock:
+            data = [job.to_json() for job in self.jobs.values()]
+        tmp = self.store_path + ".tmp"
+        with self.save_lock:
+            with open(tmp, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.store_path)
+
+    def _changed(self, persist=True):
+        self.version += 1
+        if persist:
+            self.save()
+
+    # --- Public API ---
+    def all_jobs(self):
+        with self.lock:
+            return list(self.jobs.values())
+
+    def add(self, url):
+        return self.add_many([url]) == 1
+
+    def add_many(self, urls):
+        """Queue every new URL, returns how many were added (dupes skipped)."""
+        added = 0
+        with self.lock:
+            for url in urls:
+                url, key = url.strip(), url_key(url)
+                job = self.jobs.get(key)
+                if not url or (job and job.state not in ("failed", "cancelled")):
+                    continue
+                self.jobs[key] = DownloadJob(url)
+                self.queue.put(key)
+                added += 1
+        if added:
+            self._changed()
+        return added
+
+    def cancel(self, url):
+        with self.lock:
+            job = self.jobs.get(url_key(url))
+            if job is None or job.state not in ("queued", "running"):
+                return
+            job.state = "cancelled"
+            if job.proc is not None:
+                job.proc.terminate()
+        self._changed()
+
+    def retry(self, url):
+        with self.lock:
+            job = self.jobs.get(url_key(url))
+            if job is None or job.state not in ("failed", "cancelled"):
+                return
+            job.state, job.attempts, job.error, job.progress = "queued", 0, None, 0.0
+            self.queue.put(url_key(url))
+        self._changed()
+
+    def shutdown(self):
+        # stop yt-dlp but keep the jobs queued so the next start resumes them
+        self.closing = True
+        with self.lock:
+            for job in self.jobs.values():
+                if job.state == "running":
+                    job.state = "queued"
+                    if job.proc is not None:
+                        job.proc.terminate()
+        self.save()
+
+    # --- Workers ---
+    def _job_dir(self, job):
+        # one staging dir per video: same-titled downloads can't collide, and a
+        # restarted job finds its .part again
+        return os.path.join(self.dest_dir, hashlib.sha1(url_key(job.url).encode()).hexdigest()[:16])
+
+    def _worker(self):
+        while True:
+            key = self.queue.get()
+            with self.lock:
+                job = self.jobs.get(key)
+                if self.closing or job is None or job.state != "queued":
+                    continue
+                job.state, job.progress = "running", 0.0
+            self._changed()
+            self._run(job)
+
+    def _run(self, job):
+        cmd = [
+            "yt-dlp", "-f", "bestaudio[ext=m4a]/bestaudio", "--extract-audio",
+            "--audio-format", "m4a", "--continue", "--no-playlist",
+            "--newline", "--progress", "--print", "after_move:filepath",
+            "-o", os.path.join(self._job_dir(job), "%(title)s.%(ext)s"), job.url,
+        ]
+        last_line, t0 = "", time.perf_counter()
+        try:
+            job.proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                        stdin=subprocess.DEVNULL, text=True, bufsize=1)
+            for line in job.proc.stdout:
+                m = PROGRESS_RE.match(line)
+                if m:
+                    job.progress = float(m.group(1)) / 100
+                    self._changed(persist=False)
+                elif line.strip():
+                    last_line = line.strip()
+            rc = job.proc.wait()
+        except OSError as e:
+            rc, last_line = -1, str(e)
+        job.proc = None
+        if job.state != "running":        # cancelled or shutting down
+            return
+        if rc == 0 and os.path.exists(last_line):
+            job.state, job.progress, job.error = "done", 1.0, None
+            job.filename = os.path.basename(last_line)
+            metrics.record("download.job", (time.perf_counter() - t0) * 1000)
+            self._changed()
+            self.on_done(last_line)
+            return
+        job.attempts += 1
+        job.error = last_line or f"yt-dlp exited with {rc}"
+        metrics.count("download.error")
+        if job.attempts > self.RETRY_LIMIT:
+            job.state = "failed"
+        else:
+            job.state = "queued"
+            delay = self.RETRY_BASE ** job.attempts
+            threading.Timer(delay, self.queue.put, args=(url_key(job.url),)).start()
+        self._changed()
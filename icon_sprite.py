@@ -0,0 +1,82 @@
+"""Pre-decoded icon sprite. Build: python3 icon_sprite.py [icons_dir] [sprite_path]"""
+import os
+import sys
+import json
+import struct
+
+from PIL import Image
+
+MAGIC     = b"KIPSPRITE2"
+SPRITE_PX = 48   # 20px icons at up to 2.4x scaling
+
+
+def signature(icons_dir):
+    """[name, size] of every PNG. Not mtimes: packaging and dpkg rewrite those."""
+    return [[name, os.path.getsize(os.path.join(icons_dir, name))]
+            for name in sorted(os.listdir(icons_dir)) if name.lower().endswith(".png")]
+
+
+def build(icons_dir, sprite_path, px=SPRITE_PX):
+    """Shrink every PNG in icons_dir to px and store the raw RGBA pixels in one file."""
+    index, blobs, offset = {}, [], 0
+    sig = signature(icons_dir)
+    for name, _ in sig:
+        with Image.open(os.path.join(icons_dir, name)) as im:
+            im = im.convert("RGBA")
+            im.thumbnail((px, px), Image.LANCZOS)
+        data = im.tobytes()
+        index[name] = [im.width, im.height, offset]
+        blobs.append(data); offset += len(data)
+    header = json.dumps({"signature": sig, "icons": index}).encode()
+    tmp = sprite_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header)) + header)
+        f.writelines(blobs)
+    os.replace(tmp, sprite_path)
+    return len(index)
+
+
+class IconSet:
+    """Icons by file name, from the sprite when it is current, else from the PNGs.
+
+    get() returns None for icons that don't exist.
+    """
+
+    def __init__(self, icons_dir, sprite_path):
+        self.icons_dir = icons_dir
+        self.images    = {}
+        self.index, self.blob = {}, b""
+        try:
+            with open(sprite_path, "rb") as f:
+                data = f.read()
+            if data.startswith(MAGIC):
+                n = len(MAGIC)
+                size, = struct.unpack_from("<I", data, n)
+                header = json.loads(data[n + 4:n + 4 + size])
+                # an icon added, removed or replaced since the build retires the sprite
+                if header["signature"] == signature(icons_dir):
+                    self.index = header["icons"]
+                    self.blob = memoryview(data)[n + 4 + size:]
+        except (OSError, ValueError, KeyError, struct.error):
+            self.index = {}
+
+    def get(self, name):
+        img = self.images.get(name)
+        if img is not None:
+            return img
+        if name in self.index:
+            w, h, offset = self.index[name]
+            img = Image.frombuffer("RGBA", (w, h), self.blob[offset:offset + w * h * 4], "raw", "RGBA", 0, 1)
+        else:
+            path = os.path.join(self.icons_dir, name)
+            if not os.path.exists(path):
+                return None
+            img = Image.open(path)
+        self.images[name] = img
+        return img
+
+
+if __name__ == "__main__":
+    icons_dir   = sys.argv[1] if len(sys.argv) > 1 else os.path.join("assets", "icons")
+    sprite_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join("assets", "icons.sprite")
+    print(f"{build(icons_dir, sprite_path)} icons -> {sprite_path}")
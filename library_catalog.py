@@ -0,0 +1,172 @@
+import os
+import re
+import sqlite3
+import threading
+from itertools import islice
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from audio_tags import read_tags
+from telemetry import metrics
+
+AUDIO_EXTS = (".m4a", ".mp3")
+
+Track = namedtuple("Track", "path artist title album duration mtime size")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    path     TEXT PRIMARY KEY,   -- file name relative to the library dir
+    mtime    INTEGER NOT NULL,   -- st_mtime_ns
+    size     INTEGER NOT NULL,
+    artist   TEXT,
+    title    TEXT,
+    album    TEXT,
+    duration REAL,
+    tagged   INTEGER NOT NULL DEFAULT 0,  -- tags of this (mtime, size) have been read
+    hash     TEXT                         -- content hash, filled in when a same-sized file is imported
+);
+CREATE INDEX IF NOT EXISTS tracks_size ON tracks (size);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# columns added after the first release, for databases created before them
+ADDED_COLUMNS = {"tagged": "INTEGER NOT NULL DEFAULT 0", "hash": "TEXT"}
+
+
+def extract_metadata(filename):
+    base = os.path.splitext(os.path.basename(filename))[0]
+    parts = re.split(r" - |_", base)
+    if len(parts) >= 2:
+        return parts[0].strip(), parts[1].strip()
+    return "Unknown Artist", base
+
+
+class LibraryCatalog:
+    """SQLite index of the audio files in the library directory.
+
+    refresh() only walks the directory when its mtime moved since the last
+    scan (force=True always walks, to catch files edited in place), and then
+    only re-parses files whose (mtime, size) changed. New rows get
+    artist/title from the file name; tag_pending() then reads the real tags
+    on a thread pool, once per (path, mtime, size).
+    """
+
+    TAG_BATCH = 256
+
+    def __init__(self, library_dir="library", db_path="library.db"):
+        self.library_dir = library_dir
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        have = {row[1] for row in self.db.execute("PRAGMA table_info(tracks)")}
+        for column, decl in ADDED_COLUMNS.items():
+            if have and column not in have:
+                self.db.execute(f"ALTER TABLE tracks ADD COLUMN {column} {decl}")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def _get_meta(self, key):
+        row = self.db.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @metrics.timed("library.refresh")
+    def refresh(self, force=False):
+        """Sync the index with the directory. Returns True if anything changed."""
+        try:
+            dir_mtime = str(os.stat(self.library_dir).st_mtime_ns)
+        except OSError:
+            return False
+        with self.lock:
+            if not force and self._get_meta("dir_mtime") == dir_mtime:
+                return False
+            known = {p: (m, s) for p, m, s in self.db.execute("SELECT path, mtime, size FROM tracks")}
+            seen, upserts = set(), []
+            with os.scandir(self.library_dir) as it:
+                for entry in it:
+                    if not entry.name.lower().endswith(AUDIO_EXTS) or not entry.is_file():
+                        continue
+                    st = entry.stat()
+                    seen.add(entry.name)
+                    if known.get(entry.name) != (st.st_mtime_ns, st.st_size):
+                        artist, title = extract_metadata(entry.name)
+                        upserts.append((entry.name, st.st_mtime_ns, st.st_size, artist, title))
+            removed = [(p,) for p in known.keys() - seen]
+            with self.db:
+                self.db.executemany(
+                    "INSERT INTO tracks (path, mtime, size, artist, title) VALUES (?,?,?,?,?) "
+                    "ON CONFLICT(path) DO UPDATE SET mtime=excluded.mtime, size=excluded.size, "
+                    "artist=excluded.artist, title=excluded.title, album=NULL, duration=NULL, tagged=0, hash=NULL",
+                    upserts)
+                self.db.executemany("DELETE FROM tracks WHERE path=?", removed)
+                self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('dir_mtime', ?)", (dir_mtime,))
+            return bool(upserts or removed)
+
+    @metrics.timed("library.tags")
+    def tag_pending(self, workers=4):
+        """Read the tags of every track not parsed yet. Returns how many were updated."""
+        with self.lock:
+            todo = self.db.execute("SELECT path, mtime, size FROM tracks WHERE tagged=0").fetchall()
+        if not todo:
+            return 0
+        parse = lambda row: (row, read_tags(os.path.join(self.library_dir, row[0])))
+        done = 0
+        with ThreadPoolExecutor(workers, thread_name_prefix="tag-reader") as pool:
+            results = pool.map(parse, todo)
+            while True:
+                batch = list(islice(results, self.TAG_BATCH))
+                if not batch:
+                    break
+                rows = []
+                for (path, mtime, size), tags in batch:
+                    artist, title = extract_metadata(path)
+                    rows.append((tags.artist or artist, tags.title or title, tags.album, tags.duration,
+                                 path, mtime, size))
+                # a file that changed meanwhile keeps tagged=0 and is read again next time
+                with self.lock, self.db:
+                    self.db.executemany("UPDATE tracks SET artist=?, title=?, album=?, duration=?, tagged=1 "
+                                        "WHERE path=? AND mtime=? AND size=?", rows)
+                done += len(rows)
+        return done
+
+    # --- Imports ---
+    def add(self, files):
+        """Index (name, hash or None) library files right away, tags included, in one
+        transaction. Returns their Tracks."""
+        tracks, rows = [], []
+        for name, digest in files:
+            path = os.path.join(self.library_dir, name)
+            st, tags = os.stat(path), read_tags(path)
+            artist, title = extract_metadata(name)
+            track = Track(name, tags.artist or artist, tags.title or title, tags.album, tags.duration,
+                          st.st_mtime_ns, st.st_size)
+            tracks.append(track)
+            rows.append((*track, digest))
+        with self.lock, self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO tracks (path, artist, title, album, duration, mtime, size, tagged, hash) "
+                "VALUES (?,?,?,?,?,?,?,1,?)", rows)
+        return tracks
+
+    def remove(self, name):
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM tracks WHERE path=?", (name,))
+
+    def same_size(self, size):
+        """(path, hash) of every track of exactly size bytes; hash may be None."""
+        with self.lock:
+            return self.db.execute("SELECT path, hash FROM tracks WHERE size=?", (size,)).fetchall()
+
+    def set_hash(self, name, digest):
+        with self.lock, self.db:
+            self.db.execute("UPDATE tracks SET hash=? WHERE path=?", (digest, name))
+
+    def tracks(self):
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT path, artist, title, album, duration, mtime, size FROM tracks ORDER BY path").fetchall()
+        return [Track(*r) for r in rows]
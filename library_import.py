@@ -0,0 +1,257 @@
+import os
+import time
+import queue
+import shutil
+import hashlib
+import threading
+
+try:
+    import fcntl
+except ImportError:          # not on Linux/Unix: no reflinks
+    fcntl = None
+
+from library_catalog import AUDIO_EXTS
+from telemetry import metrics
+
+FICLONE = 0x40049409         # linux/fs.h: share extents with another file (btrfs, xfs)
+CHUNK   = 1024 * 1024
+BATCH   = 64             # files per catalog transaction...
+BATCH_S = 0.5            # ...or seconds, whichever comes first
+
+
+def file_hash(path):
+    """blake2b of the file contents, read in CHUNK sized pieces."""
+    h, buf = hashlib.blake2b(digest_size=20), bytearray(CHUNK)
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                return h.hexdigest()
+            h.update(view[:n])
+
+
+class LibraryImporter:
+    """Brings files into the library on one worker thread.
+
+    import_paths() takes dropped files and folders, which are left where they
+    are; adopt() takes finished downloads from a staging directory and moves
+    them in. A file whose content is already in the library is skipped (or,
+    for adopt(), deleted). Contents
+    are only hashed when the catalog has another track of the very same
+    size. New files are reflinked, hardlinked (same filesystem) or copied
+    in-kernel with copy_file_range, in that order of preference, and never
+    overwrite a different file of the same name.
+
+    Every new Track is indexed in the catalog and queued for take_added();
+    progress and version let the UI poll cheaply, like the download manager.
+    """
+
+    def __init__(self, catalog, hardlink=True):
+        self.catalog     = catalog
+        self.library_dir = catalog.library_dir
+        self.hardlink    = hardlink
+        self.jobs        = queue.Queue()
+        self.lock        = threading.Lock()
+        self.added       = []                     # Tracks not yet picked up by the UI
+        self.pending     = []                     # (name, hash) placed but not in the catalog yet
+        self.progress    = {"total": 0, "done": 0, "imported": 0, "duplicates": 0, "failed": 0}
+        self.placed      = {"reflink": 0, "link": 0, "copy": 0}   # how imported files got there
+        self.no_reflink  = set()                  # st_dev of sources whose filesystem refused FICLONE
+        self.version     = 0
+        threading.Thread(target=self._worker, name="library-import", daemon=True).start()
+
+    # --- Public API ---
+    def import_paths(self, paths):
+        self.jobs.put(("import", list(paths)))
+
+    def adopt(self, path, on_done=None):
+        """Move the download at path into the library. path and, once empty, its
+        directory are consumed. on_done(name) gets the library file to use: the
+        new track, the one it duplicated, or None if path is gone."""
+        self.jobs.put(("adopt", (path, on_done)))
+
+    def busy(self):
+        return self.progress["done"] < self.progress["total"]
+
+    def take_added(self):
+        with self.lock:
+            added, self.added = self.added, []
+        return added
+
+    # --- Worker ---
+    def _changed(self, **counts):
+        with self.lock:
+            for key, n in counts.items():
+                self.progress[key] += n
+            self.version += 1
+
+    def _worker(self):
+        while True:
+            kind, arg = self.jobs.get()
+            try:
+                with metrics.timer(f"import.{kind}"):
+                    if kind == "import":
+                        self._import(arg)
+                    else:
+                        path, on_done = arg
+                        name = self._adopt(path)
+                        if on_done is not None:
+                            on_done(name)
+            except Exception as e:
+                print("❌ import failed:", e)
+
+    def _expand(self, paths):
+        for path in paths:
+            if os.path.isdir(path):
+                for root, dirs, files in os.walk(path):
+                    dirs.sort()
+                    for name in sorted(files):
+                        if name.lower().endswith(AUDIO_EXTS):
+                            yield os.path.join(root, name)
+            elif path.lower().endswith(AUDIO_EXTS) and os.path.isfile(path):
+                yield path
+
+    def _import(self, paths):
+        files = list(self._expand(paths))
+        if not files:
+            return
+        self._changed(total=len(files))
+        self.catalog.refresh()                    # dedup against what is on disk right now
+        sizes, flushed = set(), time.monotonic()
+        for src in files:
+            try:
+                size = os.path.getsize(src)
+                if size in sizes:                 # may duplicate a file of this batch
+                    self._flush(); sizes.clear()
+                digest, dup = self._duplicate(src, size)
+                if dup is not None:
+                    metrics.count("import.duplicate")
+                    self._changed(done=1, duplicates=1)
+                    continue
+                name = self._free_name(os.path.basename(src))
+                self.placed[self._place(src, os.path.join(self.library_dir, name))] += 1
+                self.pending.append((name, digest)); sizes.add(size)
+                self._changed(done=1, imported=1)
+            except OSError as e:
+                print("❌", src, e)
+                self._changed(done=1, failed=1)
+            if len(self.pending) >= BATCH or time.monotonic() - flushed > BATCH_S:
+                self._flush(); sizes.clear()
+                flushed = time.monotonic()
+        self._flush()
+
+    def _adopt(self, path):
+        if not os.path.isfile(path):
+            return None
+        try:
+            digest, dup = self._duplicate(path, os.path.getsize(path))
+            if dup is not None:
+                metrics.count("import.duplicate")
+                self._changed(duplicates=1)
+                return dup
+            name = self._move_in(path, os.path.basename(path))
+            self.pending.append((name, digest))
+            self._flush()
+            return name
+        finally:
+            for remove in (os.remove, os.rmdir):  # the download, then its staging dir if empty
+                try:
+                    remove(path)
+                except OSError:
+                    pass
+                path = os.path.dirname(path)
+
+    def _move_in(self, src, name):
+        """Hardlink src into the library under a free variant of name; never overwrites."""
+        while True:
+            name = self._free_name(name)
+            dst = os.path.join(self.library_dir, name)
+            try:
+                os.link(src, dst)
+                return name
+            except FileExistsError:
+                continue                          # taken since _free_name looked
+            except OSError:                       # other filesystem: clone or copy
+                self._place(src, dst)
+                return name
+
+    def _flush(self):
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, []
+        try:
+            tracks = self.catalog.add(pending)
+        except OSError as e:                      # removed again in the meantime, next scan sorts it out
+            print("❌", e)
+            return
+        with self.lock:
+            self.added.extend(tracks)
+            self.version += 1
+
+    def _duplicate(self, path, size, exclude=None):
+        """(hash of path or None, library file with the same content or None)."""
+        candidates = [(p, h) for p, h in self.catalog.same_size(size) if p != exclude]
+        if not candidates:
+            return None, None
+        digest = file_hash(path)
+        for name, known in candidates:
+            if known is None:
+                try:
+                    known = file_hash(os.path.join(self.library_dir, name))
+                except OSError:
+                    continue                      # gone, the next scan drops it
+                self.catalog.set_hash(name, known)
+            if known == digest:
+                return digest, name
+        return digest, None
+
+    def _free_name(self, name):
+        stem, ext = os.path.splitext(name)
+        n = 1
+        while os.path.exists(os.path.join(self.library_dir, name)):
+            n += 1
+            name = f"{stem} ({n}){ext}"
+        return name
+
+    def _place(self, src, dst):
+        """Put a copy of src at dst without moving the bytes through Python.
+
+        Returns "reflink", "link" or "copy".
+        """
+        dev = os.stat(src).st_dev
+        if dev in self.no_reflink and self.hardlink and self._link(src, dst, dev):
+            return "link"
+        tmp = dst + ".part"                       # not an audio extension, scans ignore it
+        with open(src, "rb") as fi, open(tmp, "wb") as fo:
+            try:
+                fcntl.ioctl(fo.fileno(), FICLONE, fi.fileno())
+                method = "reflink"
+            except (AttributeError, OSError):
+                self.no_reflink.add(dev)
+                method = "link" if self.hardlink and self._link(src, dst, dev) else "copy"
+                if method == "copy":
+                    self._copy(fi, fo)
+        if method == "link":
+            os.remove(tmp)
+        else:
+            os.replace(tmp, dst)
+        return method
+
+    def _link(self, src, dst, dev):
+        try:
+            if dev != os.stat(self.library_dir).st_dev:
+                return False
+            os.link(src, dst)
+            return True
+        except OSError:
+            return False
+
+    @staticmethod
+    def _copy(fi, fo):
+        try:
+            while os.copy_file_range(fi.fileno(), fo.fileno(), 1 << 30):
+                pass
+        except (AttributeError, OSError):
+            fi.seek(0); fo.seek(0); fo.truncate()
+            shutil.copyfileobj(fi, fo, CHUNK)
@@ -0,0 +1,218 @@
+import re
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from itertools import chain
+
+from telemetry import metrics
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def trigrams(text):
+    return {text[i:i+3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """Trigram/prefix index over the library for search-as-you-type.
+
+    Every token of the query has to appear as a substring of a track's
+    artist/title/album/file name. Hits are ranked: text starts with the first
+    token, then every token starts a word, then the rest, each group in the
+    order the docs were given (hit lists over RANK_LIMIT only get the first
+    group lifted). When nothing matches, tracks sharing most of
+    the query's trigrams are returned instead so small typos still find
+    something.
+    """
+
+    FUZZY_MIN_OVERLAP = 0.5
+    SHORT_CACHE_SIZE  = 16
+    NARROW_LIMIT      = 5000   # above this, index lookups beat re-filtering
+    RANK_LIMIT        = 10000  # above this, only lift text-prefix hits
+
+    def __init__(self, docs=()):
+        self.build(docs)
+
+    def build(self, docs):
+        """docs: iterable of (key, *fields). Keys keep their given order."""
+        self.keys, self.texts = [], []
+        self.postings = defaultdict(list)   # trigram -> doc ids
+        words = defaultdict(list)           # word    -> doc ids
+        for doc_id, (key, *fields) in enumerate(docs):
+            text = " ".join(f for f in fields if f).lower()
+            self.keys.append(key)
+            self.texts.append(text)
+            # pad so every character position starts a trigram, which lets
+            # 1-2 char tokens be answered from the same postings
+            for tri in trigrams(text + "  "):
+                self.postings[tri].append(doc_id)
+            for word in set(_TOKEN_RE.findall(text)):
+                words[word].append(doc_id)
+        self.postings = dict(self.postings)
+        self.grams = sorted(self.postings)
+        self.words = dict(words)
+        self.vocab = sorted(self.words)
+        by_text = sorted(range(len(self.texts)), key=self.texts.__getitem__)
+        self.sorted_texts = [self.texts[i] for i in by_text]
+        self.sorted_ids = by_text
+        self._short = {}          # 1-2 char token -> doc ids containing it
+        self._word_prefix_cache = {}
+        self._ranked_short = {}   # ranked ids for 1-2 char queries, they match the most
+        self._last_query, self._last_ids = None, None
+
+    def add(self, docs):
+        """Append docs without rebuilding; they rank after the existing ones."""
+        for key, *fields in docs:
+            doc_id = len(self.keys)
+            text = " ".join(f for f in fields if f).lower()
+            self.keys.append(key)
+            self.texts.append(text)
+            for tri in trigrams(text + "  "):
+                posting = self.postings.get(tri)
+                if posting is None:
+                    posting = self.postings[tri] = []
+                    insort(self.grams, tri)
+                posting.append(doc_id)
+            for word in set(_TOKEN_RE.findall(text)):
+                ids = self.words.get(word)
+                if ids is None:
+                    ids = self.words[word] = []
+                    insort(self.vocab, word)
+                ids.append(doc_id)
+            pos = bisect_left(self.sorted_texts, text)
+            self.sorted_texts.insert(pos, text)
+            self.sorted_ids.insert(pos, doc_id)
+        self._short, self._word_prefix_cache, self._ranked_short = {}, {}, {}
+        self._last_query, self._last_ids = None, None
+
+    def __len__(self):
+        return len(self.keys)
+
+    # --- Lookups ---
+    def _containing(self, tok):
+        if len(tok) < 3:
+            ids = self._short.get(tok)
+            if ids is None:
+                lo = bisect_left(self.grams, tok)
+                hi = bisect_left(self.grams, tok + "\uffff", lo)
+                ids = set().union(*(self.postings[g] for g in self.grams[lo:hi]))
+                ids = self._short[tok] = sorted(ids)
+            return ids
+        ids = None
+        for tri in sorted(trigrams(tok), key=lambda t: len(self.postings.get(t, ()))):
+            posting = self.postings.get(tri)
+            if not posting:
+                return []
+            ids = set(posting) if ids is None else ids.intersection(posting)
+            if not ids:
+                return []
+        texts = self.texts
+        return [i for i in sorted(ids) if tok in texts[i]]
+
+    def _word_prefix(self, tok):
+        ids = self._word_prefix_cache.get(tok)
+        if ids is None:
+            lo = bisect_left(self.vocab, tok)
+            hi = bisect_left(self.vocab, tok + "\uffff", lo)
+            ids = set().union(*(self.words[w] for w in self.vocab[lo:hi]))
+            self._word_prefix_cache[tok] = ids
+        return ids
+
+    def _text_prefix(self, tok, ids):
+        lo = bisect_left(self.sorted_texts, tok)
+        hi = bisect_left(self.sorted_texts, tok + "\uffff", lo)
+        if hi - lo > len(ids):
+            texts = self.texts
+            return {i for i in ids if texts[i].startswith(tok)}
+        return set(self.sorted_ids[lo:hi])
+
+    # --- Matching ---
+    def _match(self, query, tokens):
+        # Narrow the previous result set while the user keeps typing
+        ids = None
+        if (self._last_query is not None and query.startswith(self._last_query)
+                and len(self._last_ids) <= self.NARROW_LIMIT):
+            ids = self._last_ids
+        texts = self.texts
+        for tok in sorted(tokens, key=len, reverse=True):
+            if ids is None:
+                ids = self._containing(tok)
+            elif len(ids) <= self.NARROW_LIMIT:
+                ids = [i for i in ids if tok in texts[i]]
+            else:
+                ids = sorted(set(self._containing(tok)).intersection(ids))
+            if not ids:
+                break
+        self._last_query, self._last_ids = query, ids
+        return ids
+
+    def _rank(self, ids, tokens):
+        if len(ids) > self.RANK_LIMIT:
+            head = self._text_prefix(tokens[0], ids)
+            if not head or len(head) == len(ids):
+                return ids
+            return sorted(head.intersection(ids)) + [i for i in ids if i not in head]
+        idset = set(ids)
+        head = idset & self._text_prefix(tokens[0], ids)
+        if len(head) == len(idset):
+            return ids
+        words = idset.difference(head)
+        for tok in tokens:
+            words &= self._word_prefix(tok)
+        if not head and (not words or len(words) == len(idset)):
+            return ids
+        rest = idset - head - words
+        return sorted(head) + sorted(words) + sorted(rest)
+
+    def _fuzzy(self, query, limit):
+        grams = trigrams(query.replace(" ", ""))
+        if not grams:
+            return []
+        need = max(1, int(len(grams) * self.FUZZY_MIN_OVERLAP))
+        postings = sorted((self.postings.get(tri, ()) for tri in grams), key=len)
+        # a doc sharing `need` of the trigrams has one of the len - need + 1 rarest,
+        # so only those postings are counted in full; the common ones are only
+        # probed for the candidates they could still lift over the bar
+        cut = len(postings) - need + 1
+        hits = Counter(chain.from_iterable(postings[:cut]))
+        for posting in postings[cut:]:
+            if len(posting) <= len(hits) * 16:
+                for i in posting:
+                    if i in hits:
+                        hits[i] += 1
+            else:
+                for i in hits:
+                    j = bisect_left(posting, i)
+                    if j < len(posting) and posting[j] == i:
+                        hits[i] += 1
+        # two stable sorts instead of a (-hits, id) key: no tuple per candidate
+        ranked = sorted(i for i, n in hits.items() if n >= need)
+        ranked.sort(key=hits.__getitem__, reverse=True)
+        return ranked[:limit]
+
+    @metrics.timed("search.query")
+    def search(self, query, limit=200):
+        """Return the keys matching query, best first.
+
+        limit only applies to the fuzzy fallback; exact matches are all
+        returned since the list view is virtualized.
+        """
+        query = query.lower().strip()
+        tokens = _TOKEN_RE.findall(query)
+        if not tokens:
+            self._last_query, self._last_ids = None, None
+            return list(self.keys)
+        ids = self._match(query, tokens)
+        if ids and len(query) <= 2:
+            ranked = self._ranked_short.get(query)
+            if ranked is None:
+                if len(self._ranked_short) >= self.SHORT_CACHE_SIZE:
+                    self._ranked_short.pop(next(iter(self._ranked_short)))
+                ranked = self._ranked_short[query] = self._rank(ids, tokens)
+            ids = ranked
+        elif ids:
+            ids = self._rank(ids, tokens)
+        else:
+            # fuzzy hits can't be narrowed further, start over next keystroke
+            self._last_query, self._last_ids = None, None
+            ids = self._fuzzy(query, limit)
+        return list(map(self.keys.__getitem__, ids))
@@ -1,4 +1,5 @@
-import sys, os
+import sys, os, time
+STARTUP_T0 = time.perf_counter()
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "vendor"))
 
 # Drag-and-Drop support via tkinterdnd2
@@ -8,53 +9,46 @@ except ImportError:
     print("❌ Missing tkinterdnd2. Run: pip3 install tkinterdnd2")
     sys.exit(1)
 
-import threading, glob, re, shutil, subprocess, requests
+import threading, tempfile, shutil
+from collections import deque
 
-from tkinter import simpledialog, messagebox, Menu
+from tkinter import simpledialog, messagebox, filedialog, Menu
 import tkinter as tk
 import customtkinter as ctk
 from customtkinter import CTkFont, CTkImage, CTkOptionMenu
-from PIL import Image
-from mpv_controller import MPVController
+from player_supervisor import PlayerSupervisor
+from download_manager import DownloadManager, youtube_id
+from art_cache import ArtCache
+from virtual_list import VirtualList
+from library_catalog import LibraryCatalog, extract_metadata
+from library_search import SearchIndex
+from library_import import LibraryImporter
+from icon_sprite import IconSet
+from telemetry import metrics
+IMPORTS_DONE = time.perf_counter()
 
 # --- Constants ---
 LIBRARY_DIR    = "library"
+INCOMING_DIR   = "incoming"                                # downloads in progress, adopted into the library
 FAVORITES_FILE = "favorites.txt"
+CATALOG_FILE   = "library.db"
+LINKS_FILE     = "saved_links.json"
 PLAYLISTS_DIR  = "playlists"
 ICONS_DIR      = os.path.join("assets", "icons")
+ICON_SPRITE    = os.path.join("assets", "icons.sprite")   # built by build-deb.sh / icon_sprite.py
 ART_DIR        = "art"
+COVERS_DIR     = os.path.join(ART_DIR, "covers")
+COVER_SIZE     = (120, 90)
+SEARCH_DEBOUNCE_MS = 60
+DOWNLOAD_WORKERS   = 3
+TAG_WORKERS        = 4
+TELEMETRY_FILE     = "telemetry.jsonl"   # KIP_TELEMETRY=1 or F12 turns collection on
 
 # --- Theme Setup ---
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("dark-blue")
 
 
-def extract_metadata(filename):
-    base = os.path.splitext(os.path.basename(filename))[0]
-    parts = re.split(r" - |_", base)
-    if len(parts) >= 2:
-        return parts[0].strip(), parts[1].strip()
-    return "Unknown Artist", base
-
-
-def fetch_youtube_thumbnail(url, dest=ART_DIR):
-    if "v=" in url:
-        vid = url.split("v=")[1].split("&")[0]
-    else:
-        vid = url.rstrip("/").split("/")[-1]
-    thumb_url = f"https://img.youtube.com/vi/{vid}/hqdefault.jpg"
-    os.makedirs(dest, exist_ok=True)
-    out = os.path.join(dest, f"{vid}.jpg")
-    try:
-        r = requests.get(thumb_url, timeout=5)
-        r.raise_for_status()
-        with open(out, "wb") as f:
-            f.write(r.content)
-        return out
-    except Exception:
-        return None
-
-
 class FOGRPlayer(TkinterDnD.Tk):
     def __init__(self):
         super().__init__()
@@ -68,20 +62,39 @@ class FOGRPlayer(TkinterDnD.Tk):
         self.button_font = CTkFont(family="Akira Jimbo", size=14)
         self.option_font = CTkFont(family="Akira Jimbo", size=12)
         self.option_add("*Font", self.button_font)
-        self.icon_sun    = CTkImage(light_image=Image.open(os.path.join(ICONS_DIR, "sun.png")),  size=(20,20))
-        self.icon_moon   = CTkImage(light_image=Image.open(os.path.join(ICONS_DIR, "moon.png")), size=(20,20))
-        self.icon_up     = CTkImage(light_image=Image.open(os.path.join(ICONS_DIR, "up.png")),    size=(16,16))
-        self.icon_down   = CTkImage(light_image=Image.open(os.path.join(ICONS_DIR, "down.png")),  size=(16,16))
+        self.icons       = IconSet(ICONS_DIR, ICON_SPRITE)
+        self.icon_sun    = self.icon("sun.png",  (20,20))
+        self.icon_moon   = self.icon("moon.png", (20,20))
+        self.icon_up     = self.icon("up.png",   (16,16))
+        self.icon_down   = self.icon("down.png", (16,16))
 
-        # State & Controller
+        # State & Controller (player, downloads and art start once the window is up)
         self.url_var        = ctk.StringVar()
         self.search_var_lib = ctk.StringVar()
         self.playlist_var   = ctk.StringVar()
-        self.mpv            = MPVController()
+        self.song_list      = []
+        self.song_index     = 0
+        self.active_list    = None
+        self.downloads_seen = -1
+        self.mpv = self.downloads = self.art = None
+        self.catalog        = LibraryCatalog(LIBRARY_DIR, CATALOG_FILE)
+        self.importer       = LibraryImporter(self.catalog)
+        self.imports_seen   = 0
+        self.play_adopted   = deque()         # downloads to play once adopted, filled off the Tk thread
+        self.search_index   = None
+        self.tracks         = {}              # library file name -> Track (real tags once read)
+        self.search_job     = None
+        self.scan_thread    = None
+        self.scan_result    = None
+        self.files_statted  = False           # first scan of the session stats every file
         self.favorites      = set()
+        self.startup_times  = {"import": (IMPORTS_DONE - STARTUP_T0) * 1000}
+        self.overlay        = None
+        self.overlay_job    = None
 
         # Ensure data dirs
         os.makedirs(LIBRARY_DIR,  exist_ok=True)
+        os.makedirs(INCOMING_DIR, exist_ok=True)
         os.makedirs(PLAYLISTS_DIR, exist_ok=True)
         os.makedirs(ART_DIR,       exist_ok=True)
         if os.path.exists(FAVORITES_FILE):
@@ -92,11 +105,20 @@ class FOGRPlayer(TkinterDnD.Tk):
         self.drop_target_register(DND_FILES)
         self.dnd_bind("<<Drop>>", self.handle_drop)
 
-        # Build UI
+        # Build UI: paint the shell now, the library fills in from a background scan
         self.build_sidebar()
         self.build_main_area()
         self.build_playback_bar()
         self.show_library()
+        self.update_idletasks()
+        self.startup_mark("first_paint")
+        self.after_idle(self.finish_startup)
+
+    def finish_startup(self):
+        self.mpv       = PlayerSupervisor()
+        self.downloads = DownloadManager(INCOMING_DIR, LINKS_FILE, workers=DOWNLOAD_WORKERS,
+                                         on_done=self.importer.adopt)
+        self.art       = ArtCache(COVERS_DIR)
 
         # Shortcuts
         self.bind("<space>", lambda e: self.toggle_play())
@@ -104,39 +126,145 @@ class FOGRPlayer(TkinterDnD.Tk):
         self.bind("<Right>", lambda e: self.adjust_position(10))
         self.bind("<Up>",    lambda e: self.change_volume(self.mpv.get_volume()+5))
         self.bind("<Down>",  lambda e: self.change_volume(self.mpv.get_volume()-5))
+        self.bind("<F12>",   lambda e: self.toggle_overlay())
+        if metrics.enabled:
+            metrics.start_export(TELEMETRY_FILE)
+        self.poll_downloads()
+        self.poll_imports()
+        self.art.pump(self)
+        self.startup_mark("services")
+
+    def startup_mark(self, stage):
+        # interactive = services running and the library list populated
+        t = self.startup_times
+        t.setdefault(stage, (time.perf_counter() - STARTUP_T0) * 1000)
+        if "interactive" in t or not ("services" in t and "library" in t):
+            return
+        t["interactive"] = max(t["services"], t["library"])
+        for name, ms in t.items():
+            metrics.record(f"startup.{name}", ms)
+        print(f"⏱ startup: import {t['import']:.0f}ms, first paint {t['first_paint']:.0f}ms, "
+              f"interactive {t['interactive']:.0f}ms")
+        if os.environ.get("KIP_EXIT_AFTER_STARTUP"):
+            self.after(0, self.on_close)
+
+    def icon(self, name, size):
+        img = self.icons.get(name)
+        return CTkImage(light_image=img, size=size) if img is not None else None
 
     def on_close(self):
-        self.mpv.stop()
+        metrics.close(TELEMETRY_FILE)
+        if self.mpv is not None:
+            self.mpv.stop()
+            self.mpv.close()
+            self.downloads.shutdown()
         self.destroy()
 
     def handle_drop(self, event):
-        for fp in self.tk.splitlist(event.data):
-            if fp.lower().endswith((".mp3", ".m4a")):
-                shutil.copy(fp, os.path.join(LIBRARY_DIR, os.path.basename(fp)))
-        self.show_library()
+        # files and folders; poll_imports adds them to the list as they land
+        self.importer.import_paths(self.tk.splitlist(event.data))
+        if getattr(self, "lib_view", None) is None or not self.lib_view.winfo_exists():
+            self.show_library()
+
+    def poll_imports(self):
+        imp = self.importer
+        while self.play_adopted:
+            self.play_song(self.play_adopted.popleft())
+        if imp.version != self.imports_seen:
+            self.imports_seen = imp.version
+            self.add_tracks(imp.take_added())
+            p, parts = imp.progress, []
+            if imp.busy():      parts.append(f"Importing {p['done']}/{p['total']}")
+            elif p["imported"]: parts.append(f"Imported {p['imported']}")
+            if p["duplicates"]: parts.append(f"{p['duplicates']} duplicates skipped")
+            if p["failed"]:     parts.append(f"{p['failed']} failed")
+            label = getattr(self, "import_label", None)
+            if label is not None and label.winfo_exists():
+                label.configure(text=" — ".join(parts))
+        self.after(200, self.poll_imports)
+
+    def add_tracks(self, tracks):
+        tracks = [tr for tr in tracks if tr.path not in self.tracks]
+        if not tracks: return
+        for tr in tracks:
+            self.tracks[tr.path] = tr
+        if self.search_index is None: return   # the running scan will pick them up
+        self.search_index.add((tr.path, tr.artist, tr.title, tr.album, tr.path) for tr in tracks)
+        view = getattr(self, "lib_view", None)
+        if view is not None and view.winfo_exists():
+            self.filter_library()
 
     def play_url(self):
+        from stream_pipeline import StreamDownload, resolve_stream, download_with_ytdlp
         url = self.url_var.get().strip()
         if not url: return
-        def runner():
+        vid = youtube_id(url)
+        if vid is not None:   # thumbnails only exist for YouTube videos
+            scaling = ctk.ScalingTracker.get_widget_scaling(self.title_label)
+            self.art.request(vid, COVER_SIZE, scaling, ctk.get_appearance_mode().lower(), self.set_cover_art)
+        # a private staging dir: a same-titled library track can't be overwritten or skipped
+        stage = tempfile.mkdtemp(dir=INCOMING_DIR)
+        def fallback(play=True):
             try:
-                title = subprocess.check_output(["yt-dlp","--get-title",url]).decode().strip()
-                safe  = re.sub(r'[\\/*?:"<>|]',"_", title)
-                fn    = f"{safe}.m4a"
-                path  = os.path.join(LIBRARY_DIR, fn)
-                subprocess.run([
-                    "yt-dlp","-f","bestaudio","--extract-audio",
-                    "--audio-format","m4a","-o",path,url
-                ], check=True)
-                thumb = fetch_youtube_thumbnail(url)
-                if thumb: self.set_cover_art(thumb)
-                self.play_song(fn)
+                path = download_with_ytdlp(url, stage)
             except Exception as e:
                 print("❌", e)
+                shutil.rmtree(stage, ignore_errors=True)
+                return
+            # a duplicate download is deleted, play the track it duplicated instead;
+            # on_done runs on the importer thread, poll_imports does the playing
+            self.importer.adopt(path, on_done=lambda name: play and name and self.play_adopted.append(name))
+        def failed(e, started):
+            # stream broke: get a complete copy the old way, only play it if nothing did yet
+            print("❌ stream download failed, retrying with yt-dlp:", e)
+            fallback(play=not started)
+        def runner():
+            try:
+                info = resolve_stream(url)
+            except Exception as e:
+                print("❌ no streamable m4a/mp3 format, downloading instead:", e)
+                return fallback()
+            StreamDownload(info, stage,
+                           on_ready=lambda path: self.mpv.play_queue([path]),
+                           on_done=self.importer.adopt,
+                           on_error=failed).start()
         threading.Thread(target=runner, daemon=True).start()
 
+    def play_song(self, name):
+        # queue the list the song was picked from so mpv can play on gaplessly
+        names=[os.path.basename(p) for p in self.song_list]
+        if name not in names:
+            view=self.active_list
+            items=view.items if view is not None and view.winfo_exists() and name in view.items else [name]
+            self.song_list=[os.path.join(LIBRARY_DIR,n) for n in items]
+            names=list(items)
+        self.song_index=names.index(name)
+        self.mpv.play_queue(self.song_list, self.song_index)
+
+    def set_cover_art(self, photo):
+        self.cover_label.configure(image=photo)
+        if not self.cover_label.winfo_ismapped():
+            self.cover_label.pack(after=self.title_label, pady=(0,5))
+
     def download_audio(self):
-        self.play_url()  # same logic minus auto-play
+        # the entry may hold several whitespace separated links
+        if self.downloads.add_many(self.url_var.get().split()):
+            self.url_var.set("")
+
+    def import_links(self):
+        path=filedialog.askopenfilename(title="Import URL list", filetypes=[("Text","*.txt"),("All","*")])
+        if not path: return
+        with open(path) as f:
+            n=self.downloads.add_many(l for l in f if l.strip() and not l.startswith("#"))
+        messagebox.showinfo("Import", f"Queued {n} new downloads.")
+
+    def poll_downloads(self):
+        # workers run off the Tk thread; only redraw when something changed
+        view=getattr(self, "downloads_view", None)
+        if view is not None and view.winfo_exists() and self.downloads.version!=self.downloads_seen:
+            self.downloads_seen=self.downloads.version
+            view.set_items(self.downloads.all_jobs(), keep_offset=True)
+        self.after(300, self.poll_downloads)
 
     def get_playlists(self):
         return sorted(f[:-9] for f in os.listdir(PLAYLISTS_DIR) if f.endswith(".playlist"))
@@ -147,12 +275,11 @@ class FOGRPlayer(TkinterDnD.Tk):
         items = [
             ("home.png",      "Home",      self.show_home),
             ("library.png",   "Library",   self.show_library),
-            ("favorites.png", "Favorites", self.show_favorites),
-            ("playlists.png", "Playlists", self.show_playlists),
+            ("heart.png",     "Favorites", self.show_favorites),
+            ("playlist.png",  "Playlists", self.show_playlists),
         ]
         for icon_file, label, cmd in items:
-            img = CTkImage(light_image=Image.open(os.path.join(ICONS_DIR, icon_file)), size=(20,20))
-            btn = ctk.CTkButton(sb, text=label, image=img, compound="left",
+            btn = ctk.CTkButton(sb, text=label, image=self.icon(icon_file, (20,20)), compound="left",
                                 fg_color="#222", hover_color="#333",
                                 text_color="#FFD369", font=self.button_font,
                                 corner_radius=5, height=40, command=cmd)
@@ -168,39 +295,157 @@ class FOGRPlayer(TkinterDnD.Tk):
         self.title_label = ctk.CTkLabel(self.main_frame, text="Now Playing",
                                         font=self.title_font, text_color="#FFD369")
         self.title_label.pack(pady=10)
-        self.content_frame = ctk.CTkScrollableFrame(self.main_frame, fg_color="#1e1e1e")
+        self.cover_label = tk.Label(self.main_frame, bd=0, bg="#1e1e1e")  # packed once there is art
+        self.content_frame = ctk.CTkFrame(self.main_frame, fg_color="#1e1e1e")
         self.content_frame.pack(fill="both", expand=True, padx=20, pady=10)
 
+    def clear_content(self):
+        if self.search_job:                       # its list is about to go
+            self.after_cancel(self.search_job)
+            self.search_job = None
+        # content_frame is a CTkFrame now, keep its own drawing canvas alive
+        for w in self.content_frame.winfo_children():
+            if not isinstance(w, tk.Canvas): w.destroy()
+
     def build_playback_bar(self):
         # Placeholder for playback controls
         pass
 
+    @metrics.timed("view.library")
     def show_library(self):
         self.title_label.configure(text="Library")
-        for w in self.content_frame.winfo_children(): w.destroy()
+        self.clear_content()
         search = ctk.CTkEntry(self.content_frame, placeholder_text="Search…",
                                 textvariable=self.search_var_lib,
                                 width=300, font=self.button_font)
-        search.pack(pady=(5,10)); search.bind("<KeyRelease>", lambda e: self.filter_library())
-        self.lib_buttons = []
-        for fp in sorted(glob.glob(os.path.join(LIBRARY_DIR,"*.m4a"))+glob.glob(os.path.join(LIBRARY_DIR,"*.mp3"))):
-            fn = os.path.basename(fp); a,t = extract_metadata(fn)
-            btn = ctk.CTkButton(self.content_frame, text=f"{a} — {t}",
-                                font=self.button_font, fg_color="#333",
-                                hover_color="#444", text_color="#fff",
-                                width=600, anchor="w",
-                                command=lambda x=fn: self.play_song(x))
-            btn.pack(pady=2); btn.bind("<Button-3>", lambda e,x=fn: self.show_song_context_menu(e,x))
-            self.lib_buttons.append((btn,(a+" "+t).lower()))
-
+        search.pack(pady=(5,10)); search.bind("<KeyRelease>", lambda e: self.schedule_filter())
+        self.import_label = ctk.CTkLabel(self.content_frame, text="", font=self.option_font, text_color="#aaa")
+        self.import_label.pack()
+        self.imports_seen = -1                 # show the last import status again
+        self.lib_view = self.active_list = VirtualList(self.content_frame, self.make_song_row, self.bind_song_row)
+        self.lib_view.pack(fill="both", expand=True)
+        if self.search_index is not None:
+            self.filter_library()
+        self.scan_library()
+
+    def scan_library(self):
+        # rescan and reindex off the Tk thread, poll_library_scan picks up the result:
+        # first with names guessed from file names, again once the tags are read
+        if self.scan_thread is not None: return
+        def publish():
+            with metrics.timer("library.index"):
+                tracks = self.catalog.tracks()
+                index = SearchIndex((tr.path, tr.artist, tr.title, tr.album, tr.path) for tr in tracks)
+            self.scan_result = (index, {tr.path: tr for tr in tracks})
+        # retagging in place changes mtime/size but not the dir mtime: stat every file
+        # once per session, view switches after that only check the dir mtime
+        force, self.files_statted = not self.files_statted, True
+        def scan():
+            if self.catalog.refresh(force=force) or self.search_index is None:
+                publish()
+            if self.catalog.tag_pending(TAG_WORKERS):
+                publish()
+        self.scan_thread = threading.Thread(target=scan, name="library-scan", daemon=True)
+        self.scan_thread.start()
+        self.after(30, self.poll_library_scan)
+
+    def poll_library_scan(self):
+        # ask before reading scan_result: a result published right before the
+        # thread exits is then still picked up on this pass
+        alive = self.scan_thread.is_alive()
+        if self.scan_result is not None:
+            old = self.tracks
+            (self.search_index, self.tracks), self.scan_result = self.scan_result, None
+            # imports that landed after the scan read the catalog
+            self.add_tracks([tr for name, tr in old.items() if name not in self.tracks
+                             and os.path.exists(os.path.join(LIBRARY_DIR, name))])
+            view = getattr(self, "lib_view", None)
+            if view is not None and view.winfo_exists():
+                self.filter_library()
+                view.set_items(view.items, keep_offset=True)   # rebind, the labels may have changed
+            self.startup_mark("library")
+        if alive:
+            self.after(30, self.poll_library_scan); return
+        self.scan_thread = None
+        self.startup_mark("library")
+
+    def song_label(self, name):
+        tr = self.tracks.get(name)
+        a,t = (tr.artist, tr.title) if tr else extract_metadata(name)
+        return f"{a} — {t}"
+
+    def schedule_filter(self):
+        # debounce: only search once typing pauses
+        if self.search_job: self.after_cancel(self.search_job)
+        self.search_job = self.after(SEARCH_DEBOUNCE_MS, self.filter_library)
+
+    @metrics.timed("search.keystroke")
     def filter_library(self):
-        term = self.search_var_lib.get().lower()
-        for btn, txt in self.lib_buttons:
-            btn.pack() if term in txt else btn.pack_forget()
-
+        self.search_job = None
+        if self.search_index is None: return   # still scanning, poll_library_scan calls back
+        if getattr(self, "lib_view", None) is None or not self.lib_view.winfo_exists(): return
+        results = self.search_index.search(self.search_var_lib.get())
+        if results != self.lib_view.items:
+            self.lib_view.set_items(results)
+
+    # --- Recycled rows for VirtualList ---
+    def make_song_row(self, parent):
+        btn = ctk.CTkButton(parent, text="", font=self.button_font, fg_color="#333",
+                            hover_color="#444", text_color="#fff", height=28, anchor="w")
+        btn.configure(command=lambda: self.play_song(btn.song))
+        btn.bind("<Button-3>", lambda e: self.show_song_context_menu(e, btn.song))
+        return btn
+
+    def bind_song_row(self, btn, song):
+        btn.song = song
+        btn.configure(text=self.song_label(song))
+
+    def make_playlist_row(self, parent):
+        row=ctk.CTkFrame(parent, fg_color="#1e1e1e", height=28)
+        ctk.CTkButton(row,image=self.icon_up,text="",width=24,
+                      command=lambda:self.swap_playlist(row.index,row.index-1)).pack(side="left")
+        ctk.CTkButton(row,image=self.icon_down,text="",width=24,
+                      command=lambda:self.swap_playlist(row.index,row.index+1)).pack(side="left")
+        row.song_btn=ctk.CTkButton(row,text="",font=self.button_font,
+                                   fg_color="#222",hover_color="#333",
+                                   text_color="#00F0FF",anchor="w",
+                                   command=lambda:self.play_song(row.song))
+        row.song_btn.pack(side="left",fill="x",expand=True)
+        return row
+
+    def bind_playlist_row(self, row, item):
+        row.index, row.song = item
+        row.song_btn.configure(text=self.song_label(row.song))
+
+    def make_download_row(self, parent):
+        row=ctk.CTkFrame(parent, fg_color="#1e1e1e", height=28)
+        row.label=ctk.CTkLabel(row, text="", width=420, anchor="w", font=self.option_font)
+        row.label.pack(side="left", padx=5)
+        row.bar=ctk.CTkProgressBar(row, width=200); row.bar.pack(side="left", padx=5)
+        row.action=ctk.CTkButton(row, text="", width=70, command=lambda: self.download_action(row.job))
+        row.action.pack(side="left", padx=5)
+        return row
+
+    def bind_download_row(self, row, job):
+        row.job=job
+        name=job.filename or job.url
+        row.label.configure(text=f"{job.state.upper():<9} {name}")
+        row.bar.set(job.progress)
+        row.action.configure(text="Cancel" if job.state in ("queued","running") else "Retry",
+                             state="disabled" if job.state=="done" else "normal")
+
+    def download_action(self, job):
+        if job.state in ("queued","running"): self.downloads.cancel(job.url)
+        else: self.downloads.retry(job.url)
+
+    def bind_favorite_row(self, btn, song):
+        btn.song = song
+        btn.configure(text=song)
+
+    @metrics.timed("view.playlists")
     def show_playlists(self):
         self.title_label.configure(text="Playlists")
-        for w in self.content_frame.winfo_children(): w.destroy()
+        self.clear_content()
         pls = self.get_playlists(); self.playlist_var.set("Select playlist")
         dropdown = CTkOptionMenu(self.content_frame, values=pls,
                                  variable=self.playlist_var,
@@ -234,24 +479,13 @@ class FOGRPlayer(TkinterDnD.Tk):
         self.title_label.configure(text=name)
         self.display_playlist([os.path.basename(p) for p in fulls])
 
+    @metrics.timed("view.playlist")
     def display_playlist(self, names):
-        for w in self.content_frame.winfo_children():
-            if isinstance(w, CTkOptionMenu): continue
-            if isinstance(w, ctk.CTkEntry) and w.cget("placeholder_text").startswith("New"): continue
-            if isinstance(w, ctk.CTkButton) and w.cget("text")=="💾 Save Playlist": continue
-            w.destroy()
-        for i,b in enumerate(names):
-            row=ctk.CTkFrame(self.content_frame, fg_color="#1e1e1e"); row.pack(fill="x",pady=2,padx=5)
-            ctk.CTkButton(row,image=self.icon_up,text="",width=24,
-                          command=lambda i=i:self.swap_playlist(i,i-1)).pack(side="left")
-            ctk.CTkButton(row,image=self.icon_down,text="",width=24,
-                          command=lambda i=i:self.swap_playlist(i,i+1)).pack(side="left")
-            a,t=extract_metadata(b)
-            ctk.CTkButton(row,text=f"{a} — {t}",font=self.button_font,
-                          fg_color="#222",hover_color="#333",
-                          text_color="#00F0FF",anchor="w",
-                          command=lambda x=b:self.play_song(x)
-            ).pack(side="left",fill="x",expand=True)
+        view=getattr(self, "playlist_view", None)
+        if view is None or not view.winfo_exists():
+            view=self.playlist_view=VirtualList(self.content_frame, self.make_playlist_row, self.bind_playlist_row)
+            view.pack(fill="both", expand=True, padx=5)
+        view.set_items(enumerate(names), keep_offset=True)
 
     def swap_playlist(self, i, j):
         if 0<=i<len(self.song_list) and 0<=j<len(self.song_list):
@@ -259,31 +493,64 @@ class FOGRPlayer(TkinterDnD.Tk):
             self.display_playlist([os.path.basename(p) for p in self.song_list])
 
     # --- New stubs to satisfy sidebar callbacks ---
+    @metrics.timed("view.home")
     def show_home(self):
         self.title_label.configure(text="Home")
-        for w in self.content_frame.winfo_children(): w.destroy()
+        self.clear_content()
         frame=ctk.CTkFrame(self.content_frame, fg_color="#1e1e1e"); frame.pack(pady=20)
         ctk.CTkEntry(frame, width=600, placeholder_text="YouTube URL...", textvariable=self.url_var).pack(side="left",padx=5)
         ctk.CTkButton(frame, text="▶️ Play URL", command=self.play_url).pack(side="left",padx=5)
         ctk.CTkButton(frame, text="⬇️ Download Audio", command=self.download_audio).pack(side="left",padx=5)
+        ctk.CTkButton(frame, text="📋 Import List", command=self.import_links).pack(side="left",padx=5)
+        self.downloads_view=VirtualList(self.content_frame, self.make_download_row, self.bind_download_row)
+        self.downloads_view.pack(fill="both", expand=True)
+        self.downloads_seen=-1
 
+    @metrics.timed("view.favorites")
     def show_favorites(self):
         self.title_label.configure(text="Favorites")
-        for w in self.content_frame.winfo_children(): w.destroy()
+        self.clear_content()
         if not self.favorites:
             ctk.CTkLabel(self.content_frame, text="No favorites yet.", font=self.button_font).pack(pady=20)
             return
-        for song in sorted(self.favorites):
-            ctk.CTkButton(self.content_frame, text=song, width=600, anchor="w",
-                          command=lambda x=song:self.play_song(x)
-            ).pack(pady=2)
+        view=self.active_list=VirtualList(self.content_frame, self.make_song_row, self.bind_favorite_row)
+        view.pack(fill="both", expand=True)
+        view.set_items(sorted(self.favorites))
 
+    @metrics.timed("view.theme")
     def toggle_theme(self):
         mode="light" if ctk.get_appearance_mode()=="dark" else "dark"
         ctk.set_appearance_mode(mode)
         ico=self.icon_sun if mode=="dark" else self.icon_moon
         self.theme_btn.configure(image=ico)
 
+    # --- Debug overlay (F12) ---
+    def toggle_overlay(self):
+        if self.overlay is not None:
+            self.after_cancel(self.overlay_job)
+            self.overlay.destroy()
+            self.overlay = self.overlay_job = None
+            return
+        if not metrics.enabled:            # collect from now on, the overlay shows what comes in
+            metrics.enabled = True
+            metrics.start_export(TELEMETRY_FILE)
+        self.overlay = tk.Label(self, justify="left", anchor="nw", font=("TkFixedFont", 9),
+                                bg="#000", fg="#9f9", padx=8, pady=6)
+        self.overlay.place(relx=1.0, rely=0.0, anchor="ne")
+        self.refresh_overlay()
+
+    def refresh_overlay(self):
+        t = self.startup_times
+        lines = ["startup  " + "  ".join(f"{k} {v:.0f}ms" for k, v in t.items()), "",
+                 metrics.format(limit=16), ""]
+        for label, u in (("theme", ctk.AppearanceModeTracker.last_update), ("scaling", ctk.ScalingTracker.last_update)):
+            if u:
+                lines.append(f"{label:<9}{u['visible']} visible {u['visible_ms']:.1f}ms, "
+                             f"{u['deferred']} deferred {u['deferred_ms']:.1f}ms")
+        self.overlay.configure(text="\n".join(lines))
+        self.overlay.lift()
+        self.overlay_job = self.after(500, self.refresh_overlay)
+
 if __name__ == "__main__":
     try:
         app = FOGRPlayer()
@@ -1,6 +1,13 @@
 import socket
 import json
 import os
+import time
+import asyncio
+import itertools
+import threading
+import concurrent.futures
+
+from telemetry import metrics
 
 class MPVController:
     def __init__(self, socket_path="/tmp/mpvsocket"):
@@ -56,3 +63,177 @@ class MPVController:
             print(f"mpv disconnected. Property '{prop}' failed.")
             self.sock = None
             return None
+
+
+class MPVError(Exception):
+    pass
+
+
+class AsyncMPVController:
+    """mpv JSON IPC client that runs on its own asyncio loop thread.
+
+    Every command carries a request_id and its reply is routed back to the
+    future that sent it, so events arriving in between can't be mistaken for
+    replies. Observed properties and events are pushed to callbacks (called
+    on the I/O thread), and the connection is re-established with backoff
+    whenever mpv goes away.
+    """
+
+    RECONNECT_MIN = 0.1
+    RECONNECT_MAX = 5.0
+
+    def __init__(self, socket_path="/tmp/mpvsocket", timeout=1.0):
+        self.socket_path = socket_path
+        self.timeout     = timeout
+        self.writer      = None
+        self.pending     = {}     # request_id -> asyncio.Future
+        self.observers   = {}     # property name -> [callback]
+        self.observe_ids = {}     # property name -> observe id
+        self.handlers    = {}     # event name -> [callback]
+        self.ids         = itertools.count(1)
+        self.connected   = threading.Event()
+        self.closing     = False
+        self.loop        = asyncio.new_event_loop()
+        self.task        = self.loop.create_task(self._connection_loop())
+        self.thread      = threading.Thread(target=self._run, name="mpv-ipc", daemon=True)
+        self.thread.start()
+
+    # --- I/O thread ---
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _connection_loop(self):
+        delay = self.RECONNECT_MIN
+        while not self.closing:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.socket_path, limit=1 << 22)
+            except Exception as e:
+                if not isinstance(e, OSError):
+                    print("❌ mpv connect:", repr(e))
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.RECONNECT_MAX)
+                continue
+            delay = self.RECONNECT_MIN
+            self.writer = writer
+            try:
+                for prop, obs_id in self.observe_ids.items():
+                    self._write(["observe_property", obs_id, prop], next(self.ids))
+                self.connected.set()
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    self._dispatch(line)
+            except (OSError, ValueError):
+                pass
+            except Exception as e:       # a bug, not mpv going away: log it and reconnect
+                print("❌ mpv IPC loop:", repr(e))
+                await asyncio.sleep(delay)
+            finally:
+                self.connected.clear()
+                self.writer = None
+                writer.close()
+                for fut in self.pending.values():
+                    if not fut.done():
+                        fut.set_exception(ConnectionError("mpv disconnected"))
+                self.pending.clear()
+
+    def _write(self, args, request_id):
+        self.writer.write((json.dumps({"command": args, "request_id": request_id}) + "\n").encode())
+
+    def _dispatch(self, line):
+        try:
+            msg = json.loads(line)
+        except json.JSONDecodeError:
+            return
+        if "error" in msg:
+            fut = self.pending.pop(msg.get("request_id"), None)
+            if fut is None or fut.done():
+                return
+            if msg["error"] == "success":
+                fut.set_result(msg.get("data"))
+            else:
+                fut.set_exception(MPVError(msg["error"]))
+        elif msg.get("event") == "property-change":
+            for cb in self.observers.get(msg.get("name"), ()):
+                self._call(cb, msg.get("data"))
+        elif "event" in msg:
+            for cb in self.handlers.get(msg["event"], ()):
+                self._call(cb, msg)
+
+    @staticmethod
+    def _call(cb, arg):
+        # a failing callback must not take the connection down with it
+        try:
+            cb(arg)
+        except Exception as e:
+            print("❌ mpv callback", getattr(cb, "__qualname__", cb), "failed:", repr(e))
+
+    async def _command(self, args):
+        if self.writer is None:
+            metrics.count("mpv.not_connected")
+            raise ConnectionError("mpv not connected")
+        request_id = next(self.ids)
+        fut = self.loop.create_future()
+        self.pending[request_id] = fut
+        t0 = time.perf_counter()
+        self._write(args, request_id)
+        try:
+            return await asyncio.wait_for(fut, self.timeout)
+        except asyncio.TimeoutError:
+            metrics.count("mpv.timeout")
+            raise
+        finally:
+            self.pending.pop(request_id, None)
+            if metrics.enabled:   # one timer per command, e.g. mpv.get_property
+                metrics.record(f"mpv.{args[0]}", (time.perf_counter() - t0) * 1000)
+
+    def _observe(self, prop, callback):
+        self.observers.setdefault(prop, []).append(callback)
+        if prop not in self.observe_ids:
+            self.observe_ids[prop] = len(self.observe_ids) + 1
+            if self.writer is not None:
+                self._write(["observe_property", self.observe_ids[prop], prop], next(self.ids))
+
+    # --- Public API, safe to call from any thread ---
+    def command_async(self, *args):
+        """Send a command, returns a concurrent.futures.Future with mpv's data."""
+        return asyncio.run_coroutine_threadsafe(self._command(list(args)), self.loop)
+
+    def command(self, *args, timeout=None):
+        try:
+            return self.command_async(*args).result(timeout or self.timeout)
+        except (MPVError, ConnectionError, asyncio.TimeoutError, concurrent.futures.TimeoutError):
+            return None
+
+    def send_command(self, command, args=None):
+        return self.command_async(command, *(args or []))
+
+    def set_property(self, prop, value):
+        return self.send_command("set_property", [prop, value])
+
+    def get_property(self, prop):
+        return self.command("get_property", prop)
+
+    def get_volume(self):
+        return self.get_property("volume") or 0
+
+    def stop(self):
+        self.send_command("stop")
+
+    def observe(self, prop, callback):
+        """Call callback(value) on the I/O thread whenever prop changes."""
+        self.loop.call_soon_threadsafe(self._observe, prop, callback)
+
+    def on(self, event, callback):
+        """Call callback(msg) on the I/O thread for every mpv event of this name."""
+        self.loop.call_soon_threadsafe(lambda: self.handlers.setdefault(event, []).append(callback))
+
+    def close(self):
+        def shutdown():
+            self.closing = True
+            self.task.add_done_callback(lambda t: self.loop.stop())
+            self.task.cancel()
+        self.loop.call_soon_threadsafe(shutdown)
+        self.thread.join(timeout=1)
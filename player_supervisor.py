@@ -0,0 +1,216 @@
+import os
+import time
+import shutil
+import itertools
+import threading
+import subprocess
+
+from mpv_controller import AsyncMPVController
+from telemetry import metrics
+
+MPV_ARGS = [
+    "--idle=yes", "--no-video", "--no-terminal", "--force-window=no",
+    "--gapless-audio=weak", "--prefetch-playlist=yes",
+]
+
+
+class MPVInstance:
+    """One mpv process plus the IPC client talking to it."""
+
+    def __init__(self, socket_path, mpv_bin="mpv"):
+        self.socket_path = socket_path
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.proc = subprocess.Popen([mpv_bin, *MPV_ARGS, f"--input-ipc-server={socket_path}"],
+                                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                     stderr=subprocess.DEVNULL)
+        self.mpv = AsyncMPVController(socket_path)
+        self.spawned = time.monotonic()
+        self.ready   = False          # IPC has connected at least once
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def starting(self, timeout):
+        """True while mpv is still coming up: alive, never connected, not overdue."""
+        if not self.ready:
+            self.ready = self.mpv.connected.is_set()
+        return not self.ready and self.alive() and time.monotonic() - self.spawned < timeout
+
+    def healthy(self, timeout=1.0):
+        return self.alive() and self.mpv.command("get_property", "pid", timeout=timeout) is not None
+
+    def close(self):
+        self.mpv.close()
+        if self.alive():
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+
+
+class PlayerSupervisor:
+    """Keeps an idle mpv running (plus a warm spare) and feeds it the queue.
+
+    The play queue is handed to mpv's own playlist with loadfile append, a
+    window of QUEUE_AHEAD tracks at a time, so track changes are gapless and
+    never wait on process startup. A watchdog thread health-checks the
+    active instance and swaps in the spare if it dies. Controller calls
+    (get_property, set_property, ...) are forwarded to the active instance.
+
+    stats collects time-to-first-audio (loadfile -> playback-restart) and
+    inter-track gaps (end-file -> next playback-restart) in milliseconds.
+    """
+
+    QUEUE_AHEAD     = 20
+    HEALTH_INTERVAL = 2.0
+    START_TIMEOUT   = 10.0        # how long a fresh mpv may take to open its socket
+
+    def __init__(self, mpv_bin="mpv", socket_dir="/tmp"):
+        self.mpv_bin    = mpv_bin
+        self.socket_dir = socket_dir
+        self.counter    = itertools.count()
+        self.lock       = threading.RLock()
+        self.queue      = []
+        self.appended   = 0           # queue[:appended] has been sent to mpv
+        self.base       = 0           # queue index of mpv's playlist entry 0
+        self.pos        = 0           # mpv's playlist-pos
+        self.stats      = {"time_to_first_audio": [], "track_gap": []}
+        self.load_sent  = None
+        self.track_end  = None
+        self.closing    = threading.Event()
+        self.available  = shutil.which(mpv_bin) is not None
+        self.active = self.spare = None
+        if not self.available:
+            # fall back to whatever mpv is listening on the default socket
+            print(f"❌ {mpv_bin} not found, using /tmp/mpvsocket")
+            self.fallback = AsyncMPVController()
+            return
+        self.active = self._spawn()
+        self.spare  = self._spawn()
+        threading.Thread(target=self._watchdog, name="mpv-watchdog", daemon=True).start()
+
+    def _spawn(self):
+        path = os.path.join(self.socket_dir, f"keep-it-playr-{os.getpid()}-{next(self.counter)}.sock")
+        inst = MPVInstance(path, self.mpv_bin)
+        inst.mpv.on("playback-restart", lambda msg, i=inst: self._on_playback_restart(i))
+        inst.mpv.on("end-file", lambda msg, i=inst: self._on_end_file(i, msg))
+        inst.mpv.observe("playlist-pos", lambda pos, i=inst: self._on_playlist_pos(i, pos))
+        return inst
+
+    def __getattr__(self, name):
+        # forward controller calls (get_property, set_property, ...) to the active mpv
+        active = self.__dict__.get("active")
+        if active is None:
+            if "fallback" not in self.__dict__:
+                raise AttributeError(name)
+            return getattr(self.fallback, name)
+        return getattr(active.mpv, name)
+
+    # --- Watchdog ---
+    def _watchdog(self):
+        # never hold the lock while waiting on mpv: event callbacks need it
+        while not self.closing.wait(self.HEALTH_INTERVAL):
+            if not self.spare.alive():
+                with self.lock:
+                    dead, self.spare = self.spare, self._spawn()
+                dead.close()
+            if self.active.starting(self.START_TIMEOUT) or self.active.healthy():
+                continue
+            print("❌ mpv stopped responding, switching to warm instance")
+            if not self.spare.mpv.connected.wait(self.START_TIMEOUT):
+                # the spare isn't up either: replace it and try again next round
+                with self.lock:
+                    dead, self.spare = self.spare, self._spawn()
+                dead.close()
+                continue
+            with self.lock:
+                dead, self.active = self.active, self.spare
+                self.spare = self._spawn()
+                if self.queue:
+                    self._load(self.base + self.pos)
+            dead.close()
+
+    # --- Queue handoff ---
+    @staticmethod
+    def _target(path):
+        # URLs and mpv protocols (appending://, https://) are passed through
+        return path if "://" in path else os.path.abspath(path)
+
+    def play_queue(self, paths, index=0):
+        """Replace mpv's playlist with paths[index:] (windowed) and start playing."""
+        if self.active is None:
+            self.fallback.command_async("loadfile", self._target(paths[index]), "replace")
+            return
+        if not self.active.mpv.connected.is_set():
+            # mpv is still starting up, hand the queue over once its socket is up
+            mpv = self.active.mpv
+            threading.Thread(target=lambda: mpv.connected.wait(5) and self.play_queue(paths, index),
+                             daemon=True).start()
+            return
+        with self.lock:
+            self.queue = [self._target(p) for p in paths]
+            self._load(index)
+
+    def _load(self, index):
+        mpv = self.active.mpv
+        self.base = self.appended = index
+        self.pos = 0
+        self.load_sent, self.track_end = time.perf_counter(), None
+        mpv.command_async("loadfile", self.queue[index], "replace")
+        mpv.set_property("pause", False)
+        self.appended += 1
+        self._top_up(0)
+
+    def _top_up(self, pos):
+        # keep QUEUE_AHEAD tracks queued behind the one that is playing
+        want = min(len(self.queue), self.base + pos + 1 + self.QUEUE_AHEAD)
+        for path in self.queue[self.appended:want]:
+            self.active.mpv.command_async("loadfile", path, "append")
+        self.appended = max(self.appended, want)
+
+    # --- Events (I/O thread) ---
+    def _on_playlist_pos(self, inst, pos):
+        if inst is self.active and isinstance(pos, int) and pos >= 0:
+            with self.lock:
+                self.pos = pos
+                self._top_up(pos)
+
+    def _on_end_file(self, inst, msg):
+        if inst is self.active and msg.get("reason") == "eof":
+            self.track_end = time.perf_counter()
+
+    def _on_playback_restart(self, inst):
+        if inst is not self.active:
+            return
+        now = time.perf_counter()
+        if self.load_sent is not None:
+            self.stats["time_to_first_audio"].append((now - self.load_sent) * 1000)
+            metrics.record("player.first_audio", self.stats["time_to_first_audio"][-1])
+            self.load_sent = None
+        elif self.track_end is not None:
+            self.stats["track_gap"].append((now - self.track_end) * 1000)
+            metrics.record("player.track_gap", self.stats["track_gap"][-1])
+        self.track_end = None
+
+    def report(self):
+        """Median/max of the collected timings, in milliseconds."""
+        out = {}
+        for name, samples in self.stats.items():
+            if samples:
+                ordered = sorted(samples)
+                out[name] = {"n": len(ordered), "median": ordered[len(ordered) // 2], "max": ordered[-1]}
+        return out
+
+    def close(self):
+        self.closing.set()
+        if self.active is None:
+            self.fallback.close()
+        for inst in (self.active, self.spare):
+            if inst is not None:
+                inst.close()
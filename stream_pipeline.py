@@ -0,0 +1,108 @@
+import os
+import re
+import json
+import time
+import threading
+import subprocess
+
+from telemetry import metrics
+
+# Only formats the library can index; anything else goes through the
+# yt-dlp download + m4a transcode fallback.
+STREAM_FORMAT = "bestaudio[ext=m4a]/bestaudio[ext=mp3]"
+
+
+def safe_filename(title):
+    return re.sub(r'[\\/*?:"<>|]', "_", title)
+
+
+def resolve_stream(url):
+    """Ask yt-dlp once for the title and direct audio URL of a video."""
+    with metrics.timer("stream.resolve"):
+        out = subprocess.check_output(["yt-dlp", "-f", STREAM_FORMAT, "-j", "--no-playlist", url],
+                                      stderr=subprocess.DEVNULL)
+    info = json.loads(out)
+    return {"title": info["title"], "url": info["url"], "ext": info["ext"],
+            "headers": info.get("http_headers") or {}}
+
+
+def download_with_ytdlp(url, dest_dir):
+    """Old path: full download and transcode, returns the path of the file in dest_dir."""
+    with metrics.timer("stream.ytdlp_download"):
+        title = subprocess.check_output(["yt-dlp", "--get-title", url]).decode().strip()
+        fn    = f"{safe_filename(title)}.m4a"
+        subprocess.run([
+            "yt-dlp", "-f", "bestaudio", "--extract-audio",
+            "--audio-format", "m4a", "-o", os.path.join(dest_dir, fn), url
+        ], check=True)
+    return os.path.join(dest_dir, fn)
+
+
+class StreamDownload:
+    """Download a resolved stream into dest_dir (staging) while it is being played.
+
+    Bytes go to "<name>.part"; once START_BYTES are on disk on_ready(path) is
+    called with a path mpv can play while the file keeps growing
+    ("appending://..."). When the transfer completes the file is renamed into
+    place and on_done(path) is called; on failure the partial file is
+    removed and on_error(exc, started) is called, started telling whether
+    playback had already begun.
+    """
+
+    CHUNK       = 64 * 1024
+    START_BYTES = 256 * 1024
+
+    def __init__(self, info, dest_dir, on_ready=None, on_done=None, on_error=None, session=None):
+        self.info     = info
+        self.filename = f"{safe_filename(info['title'])}.{info['ext']}"
+        self.path     = os.path.join(dest_dir, self.filename)
+        self.part     = self.path + ".part"
+        self.on_ready = on_ready or (lambda path: None)
+        self.on_done  = on_done or (lambda path: None)
+        self.on_error = on_error or (lambda exc, started: None)
+        self.session  = session
+        self.started  = False
+        self.received = 0
+        self.total    = None
+        self.t0       = None
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+        return self
+
+    def _ready(self):
+        self.started = True
+        metrics.record("stream.first_audio", (time.perf_counter() - self.t0) * 1000)   # waiting on the network
+        self.on_ready("appending://" + os.path.abspath(self.part))
+
+    def run(self):
+        if self.session is None:
+            import requests    # first stream, keep it off the startup path
+            self.session = requests
+        self.t0 = time.perf_counter()
+        try:
+            with self.session.get(self.info["url"], headers=self.info["headers"],
+                                  stream=True, timeout=15) as r:
+                r.raise_for_status()
+                self.total = int(r.headers.get("Content-Length") or 0) or None
+                with open(self.part, "wb") as f:
+                    for chunk in r.iter_content(self.CHUNK):
+                        f.write(chunk); f.flush()
+                        self.received += len(chunk)
+                        if not self.started and self.received >= self.START_BYTES:
+                            self._ready()
+            if self.total is not None and self.received < self.total:
+                raise IOError(f"stream ended at {self.received} of {self.total} bytes")
+            os.replace(self.part, self.path)
+            if not self.started:
+                self.started = True
+                self.on_ready(os.path.abspath(self.path))
+            metrics.record("stream.download", (time.perf_counter() - self.t0) * 1000)
+            self.on_done(self.path)
+        except Exception as e:
+            metrics.count("stream.error")
+            try:
+                os.remove(self.part)
+            except OSError:
+                pass
+            self.on_error(e, self.started)
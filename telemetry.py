@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+from functools import wraps
+
+SAMPLES = 256   # recent samples kept per timer for the percentiles
+
+
+class _Timer:
+    __slots__ = ("n", "total", "max", "recent")
+
+    def __init__(self):
+        self.n, self.total, self.max = 0, 0.0, 0.0
+        self.recent = deque(maxlen=SAMPLES)
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "t0")
+
+    def __init__(self, metrics, name):
+        self.metrics, self.name = metrics, name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, (time.perf_counter() - self.t0) * 1000)
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Telemetry:
+    """Named timers (milliseconds) and counters for the hot paths.
+
+    Off by default: while enabled is False, timer() hands out a shared no-op
+    context manager and record()/count() return at once, so instrumented code
+    pays one attribute check. Safe to use from any thread.
+
+    export() appends the cumulative numbers as one JSON line; start_export()
+    does that every interval seconds on a background thread, and only when
+    something was recorded since the last line.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled   = enabled
+        self.lock      = threading.Lock()
+        self.timers    = {}                  # name -> _Timer
+        self.counters  = {}                  # name -> int
+        self.version   = 0
+        self.exported  = -1                  # version of the last exported line
+        self.started   = time.time()
+        self.stop      = threading.Event()
+        self.exporter  = None
+
+    # --- Recording ---
+    def record(self, name, ms):
+        if not self.enabled:
+            return
+        with self.lock:
+            t = self.timers.get(name)
+            if t is None:
+                t = self.timers[name] = _Timer()
+            t.n += 1
+            t.total += ms
+            t.recent.append(ms)
+            if ms > t.max:
+                t.max = ms
+            self.version += 1
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+            self.version += 1
+
+    def timer(self, name):
+        """with metrics.timer("view.library"): ..."""
+        return _Span(self, name) if self.enabled else _NO_SPAN
+
+    def timed(self, name):
+        """Decorator form of timer()."""
+        def wrap(fn):
+            @wraps(fn)
+            def inner(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                t0 = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.record(name, (time.perf_counter() - t0) * 1000)
+            return inner
+        return wrap
+
+    def reset(self):
+        with self.lock:
+            self.timers, self.counters = {}, {}
+            self.version += 1
+
+    # --- Reporting ---
+    def snapshot(self):
+        with self.lock:
+            timers = {}
+            for name, t in self.timers.items():
+                recent = sorted(t.recent)
+                timers[name] = {"n": t.n, "total_ms": round(t.total, 3),
+                                "p50_ms": round(recent[len(recent) // 2], 3),
+                                "p95_ms": round(recent[min(len(recent) - 1, int(len(recent) * .95))], 3),
+                                "max_ms": round(t.max, 3)}
+            return {"uptime_s": round(time.time() - self.started, 1), "timers": timers,
+                    "counters": dict(self.counters)}
+
+    def format(self, snap=None, limit=20):
+        """Text table of the timers with the most total time, then the counters."""
+        snap = snap or self.snapshot()
+        rows = sorted(snap["timers"].items(), key=lambda kv: -kv[1]["total_ms"])[:limit]
+        lines = [f"{'timer':<24}{'n':>7}{'p50':>9}{'p95':>9}{'max':>9}"]
+        for name, t in rows:
+            lines.append(f"{name:<24}{t['n']:>7}{t['p50_ms']:>9.2f}{t['p95_ms']:>9.2f}{t['max_ms']:>9.1f}")
+        for name, n in sorted(snap["counters"].items()):
+            lines.append(f"{name:<24}{n:>7}")
+        return "\n".join(lines)
+
+    # --- Export ---
+    def export(self, path, **extra):
+        """Append a line to path; without extra fields only if anything changed."""
+        if self.version == self.exported and not extra:
+            return False
+        self.exported = self.version
+        line = {"t": round(time.time(), 3), "pid": os.getpid(), **extra, **self.snapshot()}
+        try:
+            with open(path, "a") as f:
+                f.write(json.dumps(line) + "\n")
+        except OSError as e:
+            print("❌ telemetry export failed:", e)
+            return False
+        return True
+
+    def start_export(self, path, interval=10.0):
+        if self.exporter is not None:
+            return
+        def loop():
+            while not self.stop.wait(interval):
+                self.export(path)
+        self.exporter = threading.Thread(target=loop, name="telemetry-export", daemon=True)
+        self.exporter.start()
+
+    def close(self, path):
+        self.stop.set()
+        if self.enabled:
+            self.export(path)
+
+
+# shared by every module; KIP_TELEMETRY=1 turns it on from the start
+metrics = Telemetry(enabled=bool(os.environ.get("KIP_TELEMETRY")))
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from audio_tags import NO_TAGS, read_tags
+from bench import make_tagged_library, write_mp3
+from library_catalog import LibraryCatalog
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    # mp3: latin-1 and utf-16 frames, CBR and Xing, cover art first; m4a: moov first and last, covr
+    return make_tagged_library(str(tmp_path_factory.mktemp("corpus")), 200)
+
+
+def matches(tags, expected):
+    return (tags.artist, tags.title, tags.album) == expected[:3] and abs(tags.duration - expected[3]) <= 0.01
+
+
+def test_read_tags_matches_written_tags(corpus):
+    lib, expect = corpus
+    bad = [name for name, want in expect.items() if not matches(read_tags(os.path.join(lib, name)), want)]
+    assert bad == []
+
+
+def test_catalog_reads_tags_once(corpus, tmp_path):
+    lib, expect = corpus
+    cat = LibraryCatalog(lib, str(tmp_path / "library.db"))
+    try:
+        cat.refresh()
+        assert cat.tag_pending(workers=4) == len(expect)
+        assert [t.path for t in cat.tracks() if not matches(t, expect[t.path])] == []
+        assert cat.tag_pending() == 0                 # cached by path/mtime/size
+    finally:
+        cat.close()
+
+
+def test_file_edited_in_place_is_read_again(tmp_path):
+    lib = tmp_path / "library"; lib.mkdir()
+    path = str(lib / "track.mp3")
+    write_mp3(path, "Old Artist", "Old Title", "Old Album", 20, 0, 0)
+    cat = LibraryCatalog(str(lib), str(tmp_path / "library.db"))
+    try:
+        cat.refresh(); cat.tag_pending()
+        st = os.stat(path)
+        write_mp3(path, "New Artist", "New Title", "New Album", 40, 0, 0)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        cat.refresh(force=True); cat.tag_pending()
+        (track,) = cat.tracks()
+        assert (track.artist, track.title, track.album) == ("New Artist", "New Title", "New Album")
+    finally:
+        cat.close()
+
+
+def test_untagged_file_falls_back_to_its_name(tmp_path):
+    path = tmp_path / "Some Artist - Some Title.mp3"
+    path.write_bytes(b"\0" * 4096)
+    assert read_tags(str(path)) == NO_TAGS
+    cat = LibraryCatalog(str(tmp_path), str(tmp_path / "library.db"))
+    try:
+        cat.refresh(); cat.tag_pending()
+        (track,) = cat.tracks()
+        assert (track.artist, track.title) == ("Some Artist", "Some Title")
+    finally:
+        cat.close()
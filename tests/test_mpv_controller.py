@@ -0,0 +1,50 @@
+import pytest
+
+from bench import fake_mpv
+from mpv_controller import AsyncMPVController, MPVError
+
+
+@pytest.fixture
+def mpv(tmp_path):
+    srv, path = fake_mpv(str(tmp_path), reorder=True)
+    client = AsyncMPVController(path, timeout=5)
+    assert client.connected.wait(5)
+    yield srv, client
+    client.close(); srv.shutdown(); srv.server_close()
+
+
+def test_out_of_order_replies_reach_their_request(mpv):
+    srv, client = mpv
+    srv.props.update({f"p{i}": i for i in range(200)})
+    futs = [client.command_async("get_property", f"p{i}") for i in range(200)]
+    assert [f.result(5) for f in futs] == list(range(200))
+    assert not client.pending
+
+
+def test_error_reply_fails_only_its_request(mpv):
+    srv, client = mpv
+    bad = client.command_async("get_property", "no-such-property")
+    good = client.command_async("get_property", "volume")
+    with pytest.raises(MPVError):
+        bad.result(5)
+    assert good.result(5) == 100
+    assert client.get_property("no-such-property") is None
+
+
+def test_events_go_to_callbacks_not_replies(mpv):
+    srv, client = mpv
+    volumes, reconfigs = [], []
+    client.observe("volume", volumes.append)
+    client.on("audio-reconfig", reconfigs.append)
+    futs = [client.command_async("set_property", "volume", v) for v in (10, 20, 30)]
+    assert [f.result(5) for f in futs] == [None, None, None]
+    assert volumes == [10, 20, 30]
+    assert len(reconfigs) >= 3
+
+
+def test_failing_callback_keeps_the_connection(mpv):
+    srv, client = mpv
+    client.observe("volume", lambda value: 1 / 0)
+    client.command_async("set_property", "volume", 5).result(5)
+    assert client.command_async("get_property", "volume").result(5) == 5
+
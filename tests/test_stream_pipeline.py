@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+from bench import fixture_server, stream_fixture, tone_fixture
+
+pytest.importorskip("requests")
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    data = tone_fixture(str(tmp_path_factory.mktemp("fixture")), seconds=12.0)
+    srv, base = fixture_server(data, 8 * 1024 * 1024)
+    yield data, base
+    srv.shutdown(); srv.server_close()
+
+
+def info(base, path):
+    return {"title": "Fixture", "url": base + path, "ext": "wav", "headers": {}}
+
+
+def test_complete_stream_plays_early_and_is_saved_intact(server, tmp_path):
+    data, base = server
+    ev = stream_fixture(info(base, "/track.wav"), str(tmp_path), data)
+    assert "error" not in ev
+    assert ev["url"] == "appending://" + str(tmp_path / "Fixture.wav.part")
+    assert ev["playable"]
+    assert ev["path"] == str(tmp_path / "Fixture.wav")
+    assert open(ev["path"], "rb").read() == data
+    assert os.listdir(tmp_path) == ["Fixture.wav"]
+
+
+def test_truncated_stream_reports_error_and_removes_part(server, tmp_path):
+    data, base = server
+    ev = stream_fixture(info(base, "/broken"), str(tmp_path), data)
+    assert "done" not in ev and "path" not in ev
+    assert ev["error"] is not None
+    assert ev["started"] is True                  # half the file is well past START_BYTES
+    assert ev["playable"]
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,132 @@
+import sys
+import weakref
+
+import customtkinter as ctk
+
+
+class VirtualList(ctk.CTkFrame):
+    """Scrollable list that only keeps the visible rows alive.
+
+    A fixed pool of row widgets is built with make_row(parent) and rebound to
+    items with bind_row(row, item) while scrolling, so the number of widgets
+    depends on the viewport height and not on how many items there are.
+    """
+
+    _instances = weakref.WeakSet()
+    _wheel_roots = weakref.WeakSet()
+
+    def __init__(self, master, make_row, bind_row, row_height=32, overscan=3, **kwargs):
+        kwargs.setdefault("fg_color", "transparent")
+        super().__init__(master, **kwargs)
+        self.make_row    = make_row
+        self.bind_row    = bind_row
+        self.row_height  = row_height
+        self.overscan    = overscan
+        self.items       = []
+        self.offset      = 0      # scroll position, unscaled pixels
+        self.rows        = []     # recycled row widgets
+        self.bound       = []     # item index bound to each row (None = needs a rebind)
+        self.placed      = set()  # slots currently placed, whatever they are bound to
+
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent", corner_radius=0)
+        self.viewport.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.viewport.bind("<Configure>", lambda e: self.refresh())
+
+        # Like CTkScrollableFrame, listen on "all" so the wheel works over any row
+        VirtualList._instances.add(self)
+        root = self.winfo_toplevel()
+        if root not in VirtualList._wheel_roots:
+            VirtualList._wheel_roots.add(root)
+            for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                root.bind_all(seq, VirtualList._dispatch_wheel, add="+")
+
+    def destroy(self):
+        VirtualList._instances.discard(self)
+        super().destroy()
+
+    # --- Items ---
+    def set_items(self, items, keep_offset=False):
+        self.items = list(items)
+        self.bound = [None] * len(self.rows)
+        if not keep_offset:
+            self.offset = 0
+        self.refresh()
+
+    # --- Layout ---
+    def _view_height(self):
+        return self._reverse_widget_scaling(self.viewport.winfo_height())
+
+    def _grow_pool(self, size):
+        while len(self.rows) < size:
+            self.rows.append(self.make_row(self.viewport))
+        # slot mapping is idx % pool size, so every row has to be rebound
+        self.bound = [None] * len(self.rows)
+
+    def refresh(self):
+        view_h = self._view_height()
+        total  = len(self.items) * self.row_height
+        self.offset = max(0, min(self.offset, total - view_h))
+
+        needed = int(view_h // self.row_height) + 2 + 2 * self.overscan
+        if needed > len(self.rows):
+            self._grow_pool(needed)
+
+        pool  = len(self.rows)
+        first = max(0, int(self.offset // self.row_height) - self.overscan)
+        last  = min(len(self.items), first + pool)
+        shown = set()
+        for idx in range(first, last):
+            slot = idx % pool
+            row  = self.rows[slot]
+            if self.bound[slot] != idx:
+                self.bind_row(row, self.items[idx])
+                self.bound[slot] = idx
+            row.place(x=0, y=idx * self.row_height - self.offset, relwidth=1)
+            shown.add(slot)
+        # set_items/_grow_pool clear bound, so placement is tracked on its own
+        for slot in self.placed - shown:
+            self.rows[slot].place_forget()
+            self.bound[slot] = None
+        self.placed = shown
+
+        if total <= view_h:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + view_h) / total)
+
+    # --- Scrolling ---
+    def yview(self, *args):
+        total = len(self.items) * self.row_height
+        if args[0] == "moveto":
+            self.offset = float(args[1]) * total
+        elif args[0] == "scroll":
+            step = self._view_height() if args[2] == "pages" else self.row_height
+            self.offset += int(args[1]) * step
+        self.refresh()
+
+    def _owns(self, widget):
+        while widget is not None:
+            if widget is self:
+                return True
+            widget = getattr(widget, "master", None)
+        return False
+
+    def _on_wheel(self, event):
+        if event.num == 4:
+            step = -1
+        elif event.num == 5:
+            step = 1
+        elif sys.platform == "darwin":
+            step = -event.delta
+        else:
+            step = -int(event.delta / 120) or (-1 if event.delta > 0 else 1)
+        self.yview("scroll", step, "units")
+
+    @staticmethod
+    def _dispatch_wheel(event):
+        for vl in list(VirtualList._instances):
+            if vl.winfo_exists() and vl._owns(event.widget):
+                vl._on_wheel(event)
+                return